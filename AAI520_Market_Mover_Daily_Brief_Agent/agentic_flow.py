@@ -36,6 +36,7 @@ class MarketMoversState(TypedDict):
     # Control flow
     tasks_completed: Annotated[list[str], operator.add]
     needs_refinement: bool
+    refinement_scope: str  # 'insights' or 'full'
     iteration_count: int
 
 
@@ -115,10 +116,13 @@ def news_router_agent(state: MarketMoversState) -> Literal['fetch_news', 'skip_n
         return 'skip_news'
 
 
-def news_fetcher_agent(state: MarketMoversState) -> MarketMoversState:
+def news_fetcher_agent(state: MarketMoversState) -> dict:
     """
     Agent: News Fetcher
     Fetches ticker-specific news from NewsAPI
+    
+    Runs in parallel with the sector analyzer, so it returns only the keys
+    it updates rather than the whole state
     """
     from data_fetch.data_fetcher import DataFetcher
     
@@ -130,17 +134,20 @@ def news_fetcher_agent(state: MarketMoversState) -> MarketMoversState:
     # Fetch news for specific tickers
     news = fetcher.get_news(tickers=tickers)
     
-    state['news_articles'] = news
-    state['tasks_completed'].append('fetch_news')
-    
     print(f"✅ [News Fetcher Agent] Retrieved {len(news)} articles")
-    return state
+    return {
+        'news_articles': news,
+        'tasks_completed': ['fetch_news']
+    }
 
 
-def sentiment_analyzer_agent(state: MarketMoversState) -> MarketMoversState:
+def sentiment_analyzer_agent(state: MarketMoversState) -> dict:
     """
     Agent: Sentiment Analyzer
     Analyzes news sentiment using DistilBERT AI model
+    
+    Part of the branch that runs alongside the sector analyzer, so it
+    returns only the keys it updates
     """
     print("🔄 [Sentiment Analyzer Agent] Analyzing news sentiment with DistilBERT...")
     
@@ -148,11 +155,12 @@ def sentiment_analyzer_agent(state: MarketMoversState) -> MarketMoversState:
     
     if not news:
         print("⚠️  [Sentiment Analyzer Agent] No news to analyze")
-        state['sentiment_analysis'] = {
-            'total_articles': 0,
-            'sentiment_distribution': {}
+        return {
+            'sentiment_analysis': {
+                'total_articles': 0,
+                'sentiment_distribution': {}
+            }
         }
-        return state
     
     # Count sentiments (already analyzed by DistilBERT in news fetcher)
     sentiment_counts = {'positive': 0, 'negative': 0, 'neutral': 0}
@@ -162,21 +170,24 @@ def sentiment_analyzer_agent(state: MarketMoversState) -> MarketMoversState:
     
     avg_sentiment = sum(a.get('sentiment_score', 0) for a in news) / len(news)
     
-    state['sentiment_analysis'] = {
-        'total_articles': len(news),
-        'sentiment_distribution': sentiment_counts,
-        'average_sentiment': avg_sentiment
-    }
-    state['tasks_completed'].append('analyze_sentiment')
-    
     print(f"✅ [Sentiment Analyzer Agent] Sentiment: {sentiment_counts}")
-    return state
+    return {
+        'sentiment_analysis': {
+            'total_articles': len(news),
+            'sentiment_distribution': sentiment_counts,
+            'average_sentiment': avg_sentiment
+        },
+        'tasks_completed': ['analyze_sentiment']
+    }
 
 
-def sector_analyzer_agent(state: MarketMoversState) -> MarketMoversState:
+def sector_analyzer_agent(state: MarketMoversState) -> dict:
     """
     Agent: Sector Analyzer
     Analyzes performance by market sector
+    
+    Runs in parallel with the news branch, so it returns only the keys it
+    updates rather than the whole state
     """
     print("🔄 [Sector Analyzer Agent] Analyzing sector performance...")
     
@@ -198,11 +209,11 @@ def sector_analyzer_agent(state: MarketMoversState) -> MarketMoversState:
         else:
             sector_perf[sector]['losers'] += 1
     
-    state['sector_analysis'] = sector_perf
-    state['tasks_completed'].append('analyze_sectors')
-    
     print(f"✅ [Sector Analyzer Agent] Analyzed {len(sector_perf)} sectors")
-    return state
+    return {
+        'sector_analysis': sector_perf,
+        'tasks_completed': ['analyze_sectors']
+    }
 
 
 def insight_generator_agent(state: MarketMoversState) -> MarketMoversState:
@@ -285,9 +296,21 @@ def brief_compiler_agent(state: MarketMoversState) -> MarketMoversState:
     Compiles all data into structured brief
     """
     from datetime import datetime
+    from generate_brief import MarketBriefAgent
     
     print("🔄 [Brief Compiler Agent] Compiling final brief...")
     
+    # On a refinement pass only the insights and recommendations have been
+    # regenerated, so refresh those sections of the existing brief
+    brief = state.get('brief_data')
+    if brief and state.get('iteration_count', 0) > 0:
+        brief['key_insights'] = state.get('insights', [])
+        brief['recommendations'] = state.get('recommendations', [])
+        state['tasks_completed'].append('compile_brief')
+        
+        print("✅ [Brief Compiler Agent] Brief sections refreshed")
+        return state
+    
     brief = {
         'metadata': {
             'generated_at': datetime.now().isoformat(),
@@ -299,9 +322,14 @@ def brief_compiler_agent(state: MarketMoversState) -> MarketMoversState:
             'total_gainers': len(state['gainers']),
             'total_losers': len(state['losers'])
         },
-        'top_gainers': state['gainers'][:10],
-        'top_losers': state['losers'][:10],
-        'news_analysis': state.get('sentiment_analysis', {}),
+        # Same schema as generate_brief.py, so both paths share the output
+        # writers and the next day's evaluation
+        'top_gainers': MarketBriefAgent._analyze_movers(state['gainers'][:10], 'gainer'),
+        'top_losers': MarketBriefAgent._analyze_movers(state['losers'][:10], 'loser'),
+        'news_analysis': {
+            **state.get('sentiment_analysis', {}),
+            'articles': state.get('news_articles', [])
+        },
         'sector_analysis': state.get('sector_analysis', {}),
         'key_insights': state.get('insights', []),
         'recommendations': state.get('recommendations', [])
@@ -323,11 +351,13 @@ def quality_evaluator_agent(state: MarketMoversState) -> MarketMoversState:
     
     brief = state['brief_data']
     needs_refinement = False
+    refinement_scope = 'insights'
     
     # Check if we have sufficient data
     if len(state['gainers']) + len(state['losers']) < 3:
         print("⚠️  [Quality Evaluator] Insufficient market data")
         needs_refinement = True
+        refinement_scope = 'full'
     
     # Check if we have insights
     if len(state.get('insights', [])) < 2:
@@ -340,6 +370,7 @@ def quality_evaluator_agent(state: MarketMoversState) -> MarketMoversState:
         print("ℹ️  [Quality Evaluator] Max iterations reached, proceeding")
     
     state['needs_refinement'] = needs_refinement
+    state['refinement_scope'] = refinement_scope
     state['iteration_count'] = state.get('iteration_count', 0) + 1
     
     if needs_refinement:
@@ -350,12 +381,15 @@ def quality_evaluator_agent(state: MarketMoversState) -> MarketMoversState:
     return state
 
 
-def evaluation_router(state: MarketMoversState) -> Literal['refine', 'output']:
+def evaluation_router(state: MarketMoversState) -> Literal['refine', 'refine_insights', 'output']:
     """
     Router: Quality Decision
     Routes to refinement or output based on quality evaluation
     """
     if state.get('needs_refinement', False):
+        if state.get('refinement_scope') == 'insights':
+            print("🔀 [Evaluation Router] Routing to insight refinement")
+            return 'refine_insights'
         print("🔀 [Evaluation Router] Routing to refinement")
         return 'refine'
     else:
@@ -363,6 +397,20 @@ def evaluation_router(state: MarketMoversState) -> Literal['refine', 'output']:
         return 'output'
 
 
+def insight_refiner_agent(state: MarketMoversState) -> MarketMoversState:
+    """
+    Agent: Insight Refiner
+    Regenerates insights and patches them into the compiled brief. Used when
+    only the insights fell short: recommendations do not depend on them, so
+    the recommendation and brief compiler agents are not re-run.
+    """
+    state = insight_generator_agent(state)
+    state['brief_data']['key_insights'] = state['insights']
+    
+    print("✅ [Insight Refiner Agent] Brief insights patched")
+    return state
+
+
 def output_generator_agent(state: MarketMoversState) -> MarketMoversState:
     """
     Agent: Output Generator
@@ -413,7 +461,6 @@ def build_market_movers_graph():
     
     workflow.add_node('data_fetcher', data_fetcher_agent)
     workflow.add_node('market_analyzer', market_analyzer_agent)
-    workflow.add_node('news_router', news_router_agent)
     workflow.add_node('news_fetcher', news_fetcher_agent)
     workflow.add_node('sentiment_analyzer', sentiment_analyzer_agent)
     workflow.add_node('sector_analyzer', sector_analyzer_agent)
@@ -421,6 +468,7 @@ def build_market_movers_graph():
     workflow.add_node('recommendation_agent', recommendation_agent)
     workflow.add_node('brief_compiler', brief_compiler_agent)
     workflow.add_node('quality_evaluator', quality_evaluator_agent)
+    workflow.add_node('insight_refiner', insight_refiner_agent)
     workflow.add_node('output_generator', output_generator_agent)
     workflow.add_node('finalizer', finalize_agent)
     
@@ -436,15 +484,19 @@ def build_market_movers_graph():
     
     # Main sequential flow
     workflow.add_edge('data_fetcher', 'market_analyzer')
-    workflow.add_edge('market_analyzer', 'news_router')
+    
+    # Sector analysis only needs the movers, so it fans out from the market
+    # analyzer and runs alongside the news/sentiment branch
+    workflow.add_edge('market_analyzer', 'sector_analyzer')
     
     # ========================================================================
     # ADD CONDITIONAL EDGES (Routing Logic)
     # ========================================================================
     
-    # News routing decision
+    # News routing decision, taken straight from the market analyzer's output
+    # (a separate router node would only re-run the check and pass state on)
     workflow.add_conditional_edges(
-        'news_router',
+        'market_analyzer',
         news_router_agent,
         {
             'fetch_news': 'news_fetcher',
@@ -455,9 +507,8 @@ def build_market_movers_graph():
     # After news fetching, continue to sentiment analysis
     workflow.add_edge('news_fetcher', 'sentiment_analyzer')
     
-    # Continue sequential flow after sentiment analysis
-    workflow.add_edge('sentiment_analyzer', 'sector_analyzer')
-    workflow.add_edge('sector_analyzer', 'insight_generator')
+    # Join: insights wait for both the sentiment and sector branches
+    workflow.add_edge(['sentiment_analyzer', 'sector_analyzer'], 'insight_generator')
     workflow.add_edge('insight_generator', 'recommendation_agent')
     workflow.add_edge('recommendation_agent', 'brief_compiler')
     workflow.add_edge('brief_compiler', 'quality_evaluator')
@@ -467,11 +518,15 @@ def build_market_movers_graph():
         'quality_evaluator',
         evaluation_router,
         {
-            'refine': 'insight_generator',  # Loop back for refinement
-            'output': 'output_generator'     # Proceed to output
+            'refine': 'insight_generator',        # Loop back for full refinement
+            'refine_insights': 'insight_refiner',  # Patch insights only
+            'output': 'output_generator'           # Proceed to output
         }
     )
     
+    # Insight-only refinement goes straight back to evaluation
+    workflow.add_edge('insight_refiner', 'quality_evaluator')
+    
     # Final steps
     workflow.add_edge('output_generator', 'finalizer')
     workflow.add_edge('finalizer', END)
@@ -499,82 +554,74 @@ def visualize_graph():
     
     print("📊 WORKFLOW STRUCTURE:\n")
     print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                         ENTRY POINT                                  │")
-    print("│                      [Data Fetcher Agent]                            │")
-    print("│                  Fetches stock market data                           │")
-    print("└────────────────────────┬────────────────────────────────────────────┘")
-    print("                         │")
-    print("                         ▼")
+    print("│                             ENTRY POINT                             │")
+    print("│                        [Data Fetcher Agent]                         │")
+    print("│                      Fetches stock market data                      │")
+    print("└──────────────────────────────────┬──────────────────────────────────┘")
+    print("                                   │")
+    print("                                   ▼")
     print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                   [Market Analyzer Agent]                            │")
-    print("│              Analyzes market health & top movers                     │")
-    print("└────────────────────────┬────────────────────────────────────────────┘")
-    print("                         │")
-    print("                         ▼")
+    print("│                       [Market Analyzer Agent]                       │")
+    print("│                 Analyzes market health & top movers                 │")
+    print("└─────────────────┬───────────────────────────────────┬───────────────┘")
+    print("                  │ 🔀 News Router                    │ IN PARALLEL")
+    print("                  │ (conditional edge)                │")
+    print("          ┌───────┴────────┐                          │")
+    print("          │ YES            │ NO                       │")
+    print("          ▼                │                          ▼")
+    print("┌──────────────────────┐   │             ┌──────────────────────────┐")
+    print("│ [News Fetcher Agent] │   │             │ [Sector Analyzer Agent]  │")
+    print("│ Fetches ticker news  │   │             │  Analyzes sector moves   │")
+    print("└─────────┬────────────┘   │             └────────────┬─────────────┘")
+    print("          │                │                          │")
+    print("          ▼                ▼                          │")
+    print("┌────────────────────────────────────┐                │")
+    print("│   [Sentiment Analyzer Agent] 🤖    │                │")
+    print("│ AI sentiment analysis (DistilBERT) │                │")
+    print("└─────────────────┬──────────────────┘                │")
+    print("                  │                                   │")
+    print("                  └────────────────┬──────────────────┘")
+    print("                                   │ JOIN: waits for both branches")
+    print("                                   ▼")
     print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                     [News Router] 🔀                                 │")
-    print("│                  Decision: Fetch news?                               │")
-    print("└─────────┬───────────────────────────────────────────┬───────────────┘")
-    print("          │ YES                                       │ NO")
-    print("          ▼                                           ▼")
-    print("┌──────────────────────┐                   ┌──────────────────────────┐")
-    print("│ [News Fetcher Agent] │                   │  [Skip to Sentiment]     │")
-    print("│ Fetches ticker news  │                   │                          │")
-    print("└──────────┬───────────┘                   └────────────┬─────────────┘")
-    print("           │                                            │")
-    print("           └────────────────────┬───────────────────────┘")
-    print("                                ▼")
+    print("│                    [Insight Generator Agent] 💡                     │")
+    print("│                       Generates key insights                        │")
+    print("└──────────────────────────────────┬──────────────────────────────────┘")
+    print("                                   │")
+    print("                                   ▼")
     print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                [Sentiment Analyzer Agent] 🤖                         │")
-    print("│           AI-powered sentiment analysis (DistilBERT)                 │")
-    print("└────────────────────────┬────────────────────────────────────────────┘")
-    print("                         │")
-    print("                         ▼")
+    print("│                      [Recommendation Agent] 🎯                      │")
+    print("│                Generates actionable recommendations                 │")
+    print("└──────────────────────────────────┬──────────────────────────────────┘")
+    print("                                   │")
+    print("                                   ▼")
     print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                  [Sector Analyzer Agent]                             │")
-    print("│                Analyzes sector performance                           │")
-    print("└────────────────────────┬────────────────────────────────────────────┘")
-    print("                         │")
-    print("                         ▼")
+    print("│                       [Brief Compiler Agent]                        │")
+    print("│                    Compiles all data into brief                     │")
+    print("└──────────────────────────────────┬──────────────────────────────────┘")
+    print("                                   │")
+    print("                                   ▼")
     print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                 [Insight Generator Agent] 💡                         │")
-    print("│                  Generates key insights                              │")
-    print("└────────────────────────┬────────────────────────────────────────────┘")
-    print("                         │")
-    print("                         ▼")
-    print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                [Recommendation Agent] 🎯                             │")
-    print("│              Generates actionable recommendations                    │")
-    print("└────────────────────────┬────────────────────────────────────────────┘")
-    print("                         │")
-    print("                         ▼")
-    print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                  [Brief Compiler Agent]                              │")
-    print("│              Compiles all data into brief                            │")
-    print("└────────────────────────┬────────────────────────────────────────────┘")
-    print("                         │")
-    print("                         ▼")
-    print("┌─────────────────────────────────────────────────────────────────────┐")
-    print("│                [Quality Evaluator Agent] ✓                           │")
-    print("│                 Evaluates brief quality                              │")
-    print("└─────────┬───────────────────────────────────────────┬───────────────┘")
-    print("          │ NEEDS REFINEMENT                          │ QUALITY OK")
-    print("          │ (Loop back)                               │")
-    print("          ▼                                           ▼")
-    print("    ┌─────────────┐                         ┌──────────────────────┐")
-    print("    │   REFINE    │                         │ [Output Generator]   │")
-    print("    │ (Max 2x)    │                         │ Saves JSON/MD/CSV    │")
-    print("    └──────┬──────┘                         └──────────┬───────────┘")
-    print("           │                                           │")
-    print("           └──────────► [Insight Generator]            │")
-    print("                                                       ▼")
-    print("                                           ┌──────────────────────┐")
-    print("                                           │   [Finalizer Agent]  │")
-    print("                                           │   Cleanup & Summary  │")
-    print("                                           └──────────┬───────────┘")
-    print("                                                      │")
-    print("                                                      ▼")
-    print("                                                    [END]")
+    print("│                     [Quality Evaluator Agent] ✓                     │")
+    print("│                       Evaluates brief quality                       │")
+    print("└─────────┬────────────────────────┬────────────────────────┬─────────┘")
+    print("          │ NEEDS REFINEMENT       │ INSIGHTS ONLY          │ QUALITY OK")
+    print("          │ (full loop)            │                        │")
+    print("          ▼                        ▼                        ▼")
+    print("   ┌─────────────┐     ┌──────────────────────┐ ┌──────────────────────┐")
+    print("   │   REFINE    │     │  [Insight Refiner]   │ │  [Output Generator]  │")
+    print("   │  (Max 2x)   │     │   Patches insights   │ │  Saves JSON/MD/CSV   │")
+    print("   └──────┬──────┘     └───────────┬──────────┘ └───────────┬──────────┘")
+    print("          │                        │                        │")
+    print("          └──► [Insight Generator] └► [Quality Evaluator]   │")
+    print("                                                            ▼")
+    print("                                                ┌──────────────────────┐")
+    print("                                                │  [Finalizer Agent]   │")
+    print("                                                │  Cleanup & Summary   │")
+    print("                                                └───────────┬──────────┘")
+    print("                                                            │")
+    print("                                                            ▼")
+    print("                                                          [END]")
     print("\n" + "=" * 80)
     print("AGENT TYPES:")
     print("=" * 80)
@@ -594,25 +641,31 @@ def print_workflow_summary():
     
     print("📋 TOTAL AGENTS: 12")
     print("\n1. Data Fetcher Agent - Fetches stock market data")
-    print("2. Market Analyzer Agent - Analyzes market health")
-    print("3. News Router Agent - Routes news fetching decision")
-    print("4. News Fetcher Agent - Fetches ticker-specific news")
-    print("5. Sentiment Analyzer Agent - AI sentiment analysis (DistilBERT)")
-    print("6. Sector Analyzer Agent - Analyzes sector performance")
-    print("7. Insight Generator Agent - Generates key insights")
-    print("8. Recommendation Agent - Creates actionable recommendations")
-    print("9. Brief Compiler Agent - Compiles final brief")
-    print("10. Quality Evaluator Agent - Evaluates brief quality")
+    print("2. Market Analyzer Agent - Analyzes market health and picks top movers")
+    print("3. News Fetcher Agent - Fetches ticker-specific news")
+    print("4. Sentiment Analyzer Agent - AI sentiment analysis (DistilBERT)")
+    print("5. Sector Analyzer Agent - Analyzes sector performance (parallel with news)")
+    print("6. Insight Generator Agent - Generates key insights")
+    print("7. Recommendation Agent - Creates actionable recommendations")
+    print("8. Brief Compiler Agent - Compiles final brief")
+    print("9. Quality Evaluator Agent - Evaluates brief quality")
+    print("10. Insight Refiner Agent - Regenerates insights and patches them into the brief")
     print("11. Output Generator Agent - Saves outputs (JSON/MD/CSV)")
     print("12. Finalizer Agent - Final cleanup and summary")
     
     print("\n🔀 ROUTING DECISIONS: 2")
-    print("\n1. News Router - Decides whether to fetch news")
-    print("2. Quality Evaluator - Decides refinement or output")
+    print("\n1. News Router - Conditional edge on the Market Analyzer: fetch news or skip to sentiment")
+    print("2. Quality Evaluator - Decides full refinement, insight-only refinement or output")
+    
+    print("\n⚡ PARALLEL BRANCHES: 1")
+    print("\n1. Sector Analyzer runs alongside News Fetcher → Sentiment Analyzer")
+    print("   Join: Insight Generator waits for both branches")
     
-    print("\n🔄 LOOPS: 1")
+    print("\n🔄 LOOPS: 2")
     print("\n1. Quality Refinement Loop - Max 2 iterations")
     print("   From: Quality Evaluator → Back to: Insight Generator")
+    print("2. Insight Refinement Loop - When only the insights fall short (same 2-iteration cap)")
+    print("   From: Quality Evaluator → Insight Refiner → Back to: Quality Evaluator")
     
     print("\n📤 OUTPUTS: 3 formats")
     print("\n1. JSON - Structured data")
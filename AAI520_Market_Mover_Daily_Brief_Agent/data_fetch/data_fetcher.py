@@ -3,6 +3,10 @@ Data Fetcher Module
 Handles fetching real market data from Yahoo Finance and NewsAPI
 """
 import os
+import re
+import threading
+import requests
+from requests.adapters import HTTPAdapter
 import yfinance as yf
 import pandas as pd
 from ta.trend import SMAIndicator
@@ -14,6 +18,11 @@ import logging
 from typing import List, Dict, Any, Tuple, Optional
 from dotenv import load_dotenv
 
+try:
+    from eventlet import greenthread, patcher, tpool
+except ImportError:  # eventlet is only needed by the dashboard server
+    greenthread = patcher = tpool = None
+
 # Load environment variables
 load_dotenv()
 
@@ -21,10 +30,37 @@ load_dotenv()
 logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
 logger = logging.getLogger(__name__)
 
+# Keyword lists for the fallback sentiment method, compiled once into a single
+# case-insensitive pattern each. The leading word boundary keeps inflections
+# ("gains", "drops") while skipping matches inside other words ("support").
+POSITIVE_WORDS = ['up', 'rise', 'gain', 'surge', 'rally', 'positive', 'profit', 'growth', 'bullish', 'strong']
+NEGATIVE_WORDS = ['down', 'fall', 'drop', 'plunge', 'decline', 'negative', 'loss', 'worry', 'bearish', 'weak']
+_POSITIVE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, POSITIVE_WORDS)) + ')', re.IGNORECASE)
+_NEGATIVE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, NEGATIVE_WORDS)) + ')', re.IGNORECASE)
+
+def _run_off_hub(func, *args):
+    """Call func, via eventlet's OS thread pool when called from a green thread,
+    so model inference does not stall the dashboard's event loop"""
+    if greenthread is not None and isinstance(greenthread.getcurrent(), greenthread.GreenThread):
+        return tpool.execute(func, *args)
+    return func(*args)
+
+def _os_thread_class():
+    """threading.Thread, or the unpatched one if eventlet has green-patched threading"""
+    if patcher is not None and patcher.is_monkey_patched('thread'):
+        return patcher.original('threading').Thread
+    return threading.Thread
+
 class DataFetcher:
-    def __init__(self):
-        """Initialize the DataFetcher with API clients and configuration"""
-        self.newsapi = NewsApiClient(api_key=os.getenv('NEWSAPI_API_KEY'))
+    def __init__(self, session: Optional[requests.Session] = None):
+        """Initialize the DataFetcher with API clients and configuration
+        
+        Args:
+            session: HTTP session shared by all outbound requests (Yahoo Finance
+                and NewsAPI). A pooled keep-alive session is created if omitted.
+        """
+        self.session = session or self._create_session()
+        self.newsapi = NewsApiClient(api_key=os.getenv('NEWSAPI_API_KEY'), session=self.session)
         self.tickers = os.getenv('YAHOO_FINANCE_TICKERS', 'AAPL,GOOGL,MSFT,AMZN,META,TSLA,NVDA,NFLX,AMD,INTC').split(',')
         self.news_page_size = int(os.getenv('NEWS_API_PAGE_SIZE', 5))
         
@@ -32,16 +68,34 @@ class DataFetcher:
         self.news_cache = {}
         self.news_last_fetched = {}
         self.news_cache_ttl = 3600  # 1 hour in seconds
+        self.news_stale_ttl = 900  # serve expired news up to 15 more minutes while refreshing
+        self._news_refreshing = set()
+        self._news_refresh_lock = threading.Lock()
+        
+        # Short-lived cache for stock data so near-simultaneous refreshes
+        # (background loop plus manual updates) share one download
+        self.stock_cache = None
+        self.stock_last_fetched = None
+        self.stock_cache_ttl = 60  # seconds
         
         # Initialize sentiment analyzer
         self.sentiment_analyzer = None
         self._init_sentiment_analyzer()
     
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """Keep-alive session sized for yfinance's threaded downloads"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
     def _init_sentiment_analyzer(self):
         """Initialize the sentiment analyzer (lazy loading to avoid startup delays)"""
         try:
-            from data_process.sentiment_analyzer import DistilBERTSentimentAnalyzer
-            self.sentiment_analyzer = DistilBERTSentimentAnalyzer()
+            from data_process.sentiment_analyzer import get_sentiment_analyzer
+            self.sentiment_analyzer = get_sentiment_analyzer()
             logger.info("Sentiment analyzer initialized successfully")
         except Exception as e:
             logger.warning(f"Could not initialize sentiment analyzer: {str(e)}. Will use fallback method.")
@@ -49,60 +103,62 @@ class DataFetcher:
     
     def get_stock_data(self) -> Tuple[List[Dict], List[Dict]]:
         """Fetch stock data for all configured tickers and identify top movers"""
+        current_time = datetime.now()
+        if (self.stock_cache is not None and
+            (current_time - self.stock_last_fetched).total_seconds() < self.stock_cache_ttl):
+            # Hand out copies so a caller that sorts or annotates the lists
+            # does not change what the next caller gets from the cache
+            gainers, losers = self.stock_cache
+            return list(gainers), list(losers)
+        
         try:
             tickers_data = {}
             
             # Use a more reliable list of tickers
             reliable_tickers = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'TSLA', 'NVDA', 'JPM', 'V', 'JNJ']
             
-            # Fetch data in chunks to avoid timeouts
-            chunk_size = 3  # Smaller chunk size for better reliability
-            for i in range(0, len(reliable_tickers), chunk_size):
-                chunk = reliable_tickers[i:i + chunk_size]
+            # Download all tickers in a single call; yfinance fetches each
+            # ticker on its own thread instead of one chunk after another
+            try:
+                data = yf.download(
+                    tickers=reliable_tickers,
+                    period='1d',
+                    interval='1d',
+                    group_by='ticker',
+                    progress=False,
+                    threads=True,
+                    auto_adjust=True,  # Explicitly set to avoid warning
+                    session=self.session
+                )
+            except Exception as e:
+                logger.error(f"Error fetching data for tickers {reliable_tickers}: {str(e)}")
+                data = pd.DataFrame()
+            
+            # Process each ticker
+            for ticker in reliable_tickers:
                 try:
-                    data = yf.download(
-                        tickers=chunk,
-                        period='1d',
-                        interval='1d',
-                        group_by='ticker',
-                        progress=False,
-                        auto_adjust=True  # Explicitly set to avoid warning
-                    )
+                    ticker_data = data[ticker] if not data.empty and ticker in data.columns.levels[0] else None
                     
-                    # Process each ticker in the chunk
-                    for ticker in chunk:
-                        try:
-                            if len(chunk) == 1:
-                                # Single ticker case
-                                ticker_data = data
-                            else:
-                                # Multiple tickers case
-                                ticker_data = data[ticker] if ticker in data.columns.levels[0] else None
-                            
-                            if ticker_data is not None and not ticker_data.empty and len(ticker_data) >= 1:
-                                current = ticker_data.iloc[-1]
-                                prev_close = ticker_data['Close'].iloc[0] if len(ticker_data) > 1 else current['Open']
-                                
-                                # Skip if we don't have valid price data
-                                if pd.isna(current['Close']) or pd.isna(prev_close):
-                                    continue
-                                    
-                                change_pct = ((current['Close'] - prev_close) / prev_close) * 100
-                                volume = int(current['Volume']) if not pd.isna(current['Volume']) else 0
-                                
-                                tickers_data[ticker] = {
-                                    'symbol': ticker,
-                                    'price': round(float(current['Close']), 2),
-                                    'change': round(float(change_pct), 2),
-                                    'volume': volume
-                                }
-                                
-                        except Exception as e:
-                            logger.warning(f"Error processing ticker {ticker}: {str(e)}")
+                    if ticker_data is not None and not ticker_data.empty and len(ticker_data) >= 1:
+                        current = ticker_data.iloc[-1]
+                        prev_close = ticker_data['Close'].iloc[0] if len(ticker_data) > 1 else current['Open']
+                        
+                        # Skip if we don't have valid price data
+                        if pd.isna(current['Close']) or pd.isna(prev_close):
                             continue
                             
+                        change_pct = ((current['Close'] - prev_close) / prev_close) * 100
+                        volume = int(current['Volume']) if not pd.isna(current['Volume']) else 0
+                        
+                        tickers_data[ticker] = {
+                            'symbol': ticker,
+                            'price': round(float(current['Close']), 2),
+                            'change': round(float(change_pct), 2),
+                            'volume': volume
+                        }
+                        
                 except Exception as e:
-                    logger.error(f"Error fetching data for tickers {chunk}: {str(e)}")
+                    logger.warning(f"Error processing ticker {ticker}: {str(e)}")
                     continue
                     
             # Separate gainers and losers
@@ -123,6 +179,11 @@ class DataFetcher:
             
             logger.info(f"Found {len(gainers)} gainers and {len(losers)} losers")
             
+            # Cache the results (empty results are retried on the next call)
+            if gainers or losers:
+                self.stock_cache = (list(gainers), list(losers))
+                self.stock_last_fetched = current_time
+            
             return gainers, losers
             
         except Exception as e:
@@ -142,110 +203,143 @@ class DataFetcher:
             cache_key = f"news_{'_'.join(tickers)}" if tickers else 'market_news'
             current_time = datetime.now()
             
-            if (cache_key in self.news_cache and 
-                cache_key in self.news_last_fetched and
-                (current_time - self.news_last_fetched[cache_key]).total_seconds() < self.news_cache_ttl):
-                return self.news_cache[cache_key]
+            # Serve fresh entries from cache. Entries just past their TTL are
+            # served stale while a background refresh fetches new ones.
+            if cache_key in self.news_cache and cache_key in self.news_last_fetched:
+                age = (current_time - self.news_last_fetched[cache_key]).total_seconds()
+                if age < self.news_cache_ttl:
+                    return self.news_cache[cache_key]
+                if age < self.news_cache_ttl + self.news_stale_ttl:
+                    self._refresh_news_in_background(cache_key, tickers)
+                    return self.news_cache[cache_key]
             
             # If not in cache or cache expired, fetch from API
-            news_items = []
-            
-            # Build search query
-            if tickers:
-                # Get company names for better search results
-                ticker_names = self._get_company_names(tickers)
-                # Build more specific query with stock/market context
-                company_query = ' OR '.join([f'"{name}"' for name in ticker_names[:3]])
-                query = f'({company_query}) AND (stock OR shares OR market OR trading OR price)'
-                logger.info(f"Fetching news for tickers {tickers} with query: {query}")
-            else:
-                query = 'stocks OR market'
-                logger.info(f"Fetching general market news with query: {query}")
+            return self._fetch_news(cache_key, tickers)
             
-            # Try to get business news first
+        except Exception as e:
+            logger.error(f"Error in get_news: {str(e)}")
+            # Fall back to mock news in case of error
+            return self._get_mock_news()
+    
+    def _refresh_news_in_background(self, cache_key: str, tickers: Optional[List[str]]):
+        """Re-fetch one cached news entry on a daemon thread (one refresh per key at a time)"""
+        with self._news_refresh_lock:
+            if cache_key in self._news_refreshing:
+                return
+            self._news_refreshing.add(cache_key)
+        
+        def refresh():
             try:
-                news = self.newsapi.get_everything(
-                    q=query,
-                    language='en',
-                    sort_by='publishedAt',
-                    page_size=self.news_page_size * 2,  # Fetch more to filter
-                    page=1
-                )
+                self._fetch_news(cache_key, tickers)
+            except Exception as e:
+                logger.warning(f"Background news refresh failed for {cache_key}: {str(e)}")
+            finally:
+                with self._news_refresh_lock:
+                    self._news_refreshing.discard(cache_key)
+        
+        # A real OS thread even under eventlet: a green thread spawned from a
+        # thread-pool worker would never be scheduled
+        _os_thread_class()(target=refresh, daemon=True).start()
+    
+    def _fetch_news(self, cache_key: str, tickers: Optional[List[str]]) -> List[Dict]:
+        """Fetch news from NewsAPI, score its sentiment and cache the result"""
+        current_time = datetime.now()
+        news_items = []
+        
+        # Build search query
+        if tickers:
+            # Get company names for better search results
+            ticker_names = self._get_company_names(tickers)
+            # Build more specific query with stock/market context
+            company_query = ' OR '.join([f'"{name}"' for name in ticker_names[:3]])
+            query = f'({company_query}) AND (stock OR shares OR market OR trading OR price)'
+            logger.info(f"Fetching news for tickers {tickers} with query: {query}")
+        else:
+            query = 'stocks OR market'
+            logger.info(f"Fetching general market news with query: {query}")
+        
+        # Try to get business news first
+        try:
+            news = self.newsapi.get_everything(
+                q=query,
+                language='en',
+                sort_by='publishedAt',
+                page_size=self.news_page_size * 2,  # Fetch more to filter
+                page=1
+            )
+            
+            if news['status'] == 'ok':
+                # Name/ticker pairs to match against, built once per fetch
+                if tickers:
+                    match_terms = list(zip((name.lower() for name in ticker_names), tickers))
                 
-                if news['status'] == 'ok':
-                    # Collect all articles first
-                    articles_to_process = []
-                    for article in news['articles']:
-                        try:
-                            # Filter articles to ensure relevance
-                            title = article['title'].lower()
-                            description = article.get('description', '').lower()
-                            
-                            # If we have specific tickers, verify article mentions them
-                            if tickers:
-                                ticker_names_lower = [name.lower() for name in self._get_company_names(tickers)]
-                                # Check if any company name or ticker is mentioned
-                                is_relevant = any(
-                                    name in title or name in description or 
-                                    ticker in title or ticker in description
-                                    for name, ticker in zip(ticker_names_lower, tickers)
-                                )
-                                
-                                # Skip if not relevant to our tickers
-                                if not is_relevant:
-                                    continue
+                # Collect all articles first
+                articles_to_process = []
+                for article in news['articles']:
+                    try:
+                        # Filter articles to ensure relevance
+                        title = article['title'].lower()
+                        description = article.get('description', '').lower()
+                        
+                        # If we have specific tickers, verify article mentions them
+                        if tickers:
+                            # Check if any company name or ticker is mentioned
+                            is_relevant = any(
+                                name in title or name in description or 
+                                ticker in title or ticker in description
+                                for name, ticker in match_terms
+                            )
                             
-                            articles_to_process.append({
-                                'title': article['title'],
-                                'source': article['source']['name'],
-                                'published_at': article['publishedAt'],
-                                'url': article['url'],
-                                'description': article.get('description', '')
-                            })
+                            # Skip if not relevant to our tickers
+                            if not is_relevant:
+                                continue
+                        
+                        articles_to_process.append({
+                            'title': article['title'],
+                            'source': article['source']['name'],
+                            'published_at': article['publishedAt'],
+                            'url': article['url'],
+                            'description': article.get('description', '')
+                        })
+                        
+                        # Stop if we have enough relevant articles
+                        if len(articles_to_process) >= self.news_page_size:
+                            break
                             
-                            # Stop if we have enough relevant articles
-                            if len(articles_to_process) >= self.news_page_size:
-                                break
-                                
-                        except Exception as e:
-                            logger.warning(f"Error collecting news article: {str(e)}")
-                            continue
-                    
-                    # Log filtering results
-                    if tickers:
-                        logger.info(f"Found {len(articles_to_process)} relevant articles after filtering for {tickers}")
+                    except Exception as e:
+                        logger.warning(f"Error collecting news article: {str(e)}")
+                        continue
+                
+                # Log filtering results
+                if tickers:
+                    logger.info(f"Found {len(articles_to_process)} relevant articles after filtering for {tickers}")
+                
+                # Perform sentiment analysis on all articles
+                if articles_to_process:
+                    sentiments = _run_off_hub(self._analyze_news_sentiment, articles_to_process)
                     
-                    # Perform sentiment analysis on all articles
-                    if articles_to_process:
-                        sentiments = self._analyze_news_sentiment(articles_to_process)
-                        
-                        # Combine articles with sentiment results
-                        for article, sentiment_data in zip(articles_to_process, sentiments):
-                            news_items.append({
-                                'title': article['title'],
-                                'source': article['source'],
-                                'published_at': article['published_at'],
-                                'url': article['url'],
-                                'sentiment': sentiment_data['sentiment'],
-                                'sentiment_score': sentiment_data['score'],
-                                'positive_score': sentiment_data.get('positive_score', 0),
-                                'negative_score': sentiment_data.get('negative_score', 0)
-                            })
-            except Exception as e:
-                logger.error(f"Error fetching news from NewsAPI: {str(e)}")
-                # Fall back to mock news if API fails
-                return self._get_mock_news()
-            
-            # Cache the results
-            self.news_cache[cache_key] = news_items
-            self.news_last_fetched[cache_key] = current_time
-            
-            return news_items
-            
+                    # Combine articles with sentiment results
+                    for article, sentiment_data in zip(articles_to_process, sentiments):
+                        news_items.append({
+                            'title': article['title'],
+                            'source': article['source'],
+                            'published_at': article['published_at'],
+                            'url': article['url'],
+                            'sentiment': sentiment_data['sentiment'],
+                            'sentiment_score': sentiment_data['score'],
+                            'positive_score': sentiment_data.get('positive_score', 0),
+                            'negative_score': sentiment_data.get('negative_score', 0)
+                        })
         except Exception as e:
-            logger.error(f"Error in get_news: {str(e)}")
-            # Fall back to mock news in case of error
+            logger.error(f"Error fetching news from NewsAPI: {str(e)}")
+            # Fall back to mock news if API fails
             return self._get_mock_news()
+        
+        # Cache the results
+        self.news_cache[cache_key] = news_items
+        self.news_last_fetched[cache_key] = current_time
+        
+        return news_items
     
     def _get_company_names(self, tickers: List[str]) -> List[str]:
         """Get company names from ticker symbols for better news search"""
@@ -287,12 +381,13 @@ class DataFetcher:
                 # Use DistilBERT sentiment analyzer
                 texts = [f"{article['title']}. {article.get('description', '')}" for article in articles]
                 results = self.sentiment_analyzer.analyze_sentiment(texts)
+                if 'error' in results['sentiment']:
+                    raise RuntimeError("model inference failed for this batch")
                 
-                for idx, row in results.iterrows():
-                    sentiment_label = row['sentiment']
-                    positive_score = row.get('positive_score', 0)
-                    negative_score = row.get('negative_score', 0)
-                    
+                for sentiment_label, positive_score, negative_score in zip(
+                        results['sentiment'].tolist(),
+                        results['positive_score'].tolist(),
+                        results['negative_score'].tolist()):
                     # Convert to sentiment label and score
                     if sentiment_label == 'positive':
                         sentiment = 'positive'
@@ -318,15 +413,11 @@ class DataFetcher:
         
         # Fallback: Simple keyword-based sentiment analysis
         for article in articles:
-            title = article['title'].lower()
-            content = article.get('description', '').lower()
-            
-            # Simple keyword-based sentiment
-            positive_words = ['up', 'rise', 'gain', 'surge', 'rally', 'positive', 'profit', 'growth', 'bullish', 'strong']
-            negative_words = ['down', 'fall', 'drop', 'plunge', 'decline', 'negative', 'loss', 'worry', 'bearish', 'weak']
+            text = f"{article['title']} {article.get('description') or ''}"
             
-            pos_count = sum(1 for word in positive_words if word in title or word in content)
-            neg_count = sum(1 for word in negative_words if word in title or word in content)
+            # Simple keyword-based sentiment: count each distinct keyword once
+            pos_count = len({m.lower() for m in _POSITIVE_RE.findall(text)})
+            neg_count = len({m.lower() for m in _NEGATIVE_RE.findall(text)})
             
             if pos_count > neg_count:
                 sentiment = 'positive'
@@ -402,7 +493,7 @@ class DataFetcher:
         """Fetch historical price data for a symbol"""
         try:
             # Download historical data
-            stock = yf.Ticker(symbol)
+            stock = yf.Ticker(symbol, session=self.session)
             df = stock.history(period=period, interval=interval)
             
             if df.empty:
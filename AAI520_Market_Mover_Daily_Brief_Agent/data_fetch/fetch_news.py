@@ -3,10 +3,12 @@ Fetch and process news articles related to stock movements.
 Supports both real-time and mock data modes.
 """
 import os
-import json
+import re
+import orjson
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Any
+import numpy as np
 import requests
 from dotenv import load_dotenv
 
@@ -17,6 +19,12 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sentiment keywords, each list compiled once into a case-insensitive pattern
+POSITIVE_WORDS = ['strong', 'growth', 'beat', 'up', 'gain', 'positive', 'profit', 'rise', 'surge', 'rally']
+NEGATIVE_WORDS = ['fall', 'drop', 'loss', 'down', 'negative', 'decline', 'concern', 'risk', 'volatile']
+_POSITIVE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, POSITIVE_WORDS)) + ')', re.IGNORECASE)
+_NEGATIVE_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, NEGATIVE_WORDS)) + ')', re.IGNORECASE)
+
 class NewsFetcher:
     """Fetches and processes news articles related to stock movements."""
     
@@ -70,18 +78,17 @@ class NewsFetcher:
             articles = response.json().get('articles', [])
             
             # Process and filter articles
+            lowered_tickers = [(ticker, ticker.lower()) for ticker in tickers]
             processed_articles = []
             for article in articles:
                 # Skip articles without content
                 if not article.get('content'):
                     continue
                     
-                # Find which tickers are mentioned in the article
-                mentioned_tickers = [
-                    ticker for ticker in tickers 
-                    if ticker.lower() in article.get('title', '').lower() or 
-                       ticker.lower() in article.get('content', '').lower()
-                ]
+                # Find which tickers are mentioned in the article (title and
+                # content lowercased once per article, not once per ticker)
+                text = f"{article.get('title') or ''}\n{article['content']}".lower()
+                mentioned_tickers = [ticker for ticker, lowered in lowered_tickers if lowered in text]
                 
                 if mentioned_tickers:
                     processed_articles.append({
@@ -137,8 +144,8 @@ class NewsFetcher:
         
         # Save mock data for reference
         os.makedirs('data', exist_ok=True)
-        with open('data/mock_news.json', 'w') as f:
-            json.dump(mock_news, f, indent=2)
+        with open('data/mock_news.json', 'wb') as f:
+            f.write(orjson.dumps(mock_news, option=orjson.OPT_INDENT_2))
         
         return mock_news
 
@@ -147,13 +154,7 @@ class NewsFetcher:
         
         In a real implementation, this would use a more sophisticated NLP model.
         """
-        positive_words = ['strong', 'growth', 'beat', 'up', 'gain', 'positive', 'profit', 'rise', 'surge', 'rally']
-        negative_words = ['fall', 'drop', 'loss', 'down', 'negative', 'decline', 'concern', 'risk', 'volatile']
-        
-        text_lower = text.lower()
-        
-        pos_score = sum(1 for word in positive_words if word in text_lower)
-        neg_score = sum(1 for word in negative_words if word in text_lower)
+        pos_score, neg_score = self._count_keywords(text)
         
         total = pos_score + neg_score
         
@@ -169,14 +170,38 @@ class NewsFetcher:
             'negative': neg_score
         }
 
+    def analyze_sentiment_batch(self, texts: List[str]) -> np.ndarray:
+        """Score many texts at once.
+        
+        Returns:
+            Array of sentiment scores in [-1, 1], one per text (same scale as
+            the 'score' field of analyze_sentiment)
+        """
+        counts = np.array([self._count_keywords(text) for text in texts], dtype=np.float64).reshape(-1, 2)
+        pos, neg = counts[:, 0], counts[:, 1]
+        total = pos + neg
+        return np.divide(pos - neg, total, out=np.zeros_like(total), where=total > 0)
+
+    @staticmethod
+    def _count_keywords(text: str):
+        """Count distinct positive and negative keywords in text."""
+        text = text or ''
+        pos = len({m.lower() for m in _POSITIVE_RE.findall(text)})
+        neg = len({m.lower() for m in _NEGATIVE_RE.findall(text)})
+        return pos, neg
+
 if __name__ == "__main__":
     # Example usage
     fetcher = NewsFetcher(use_mock=True)  # Set to False to use real API with valid key
     news = fetcher.get_news_for_tickers(['AAPL', 'MSFT', 'GOOGL', 'TSLA'])
     
+    scores = fetcher.analyze_sentiment_batch([article['content'] for article in news])
+    
     print("\nLatest News:")
-    for i, article in enumerate(news, 1):
+    for i, (article, score) in enumerate(zip(news, scores), 1):
         print(f"\n{i}. {article['title']}")
         print(f"   Source: {article['source']}")
         print(f"   Tickers: {', '.join(article['tickers'])}")
-        print(f"   Sentiment: {fetcher.analyze_sentiment(article['content'])['score']:.2f}")
+        print(f"   Sentiment: {score:.2f}")
+    
+    print(f"\nAverage Sentiment: {scores.mean() if len(scores) else 0.0:.2f}")
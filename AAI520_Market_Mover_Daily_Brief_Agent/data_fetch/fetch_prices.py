@@ -50,7 +50,8 @@ class StockPriceFetcher:
                 start=start_date.strftime('%Y-%m-%d'),
                 end=end_date.strftime('%Y-%m-%d'),
                 group_by='ticker',
-                progress=False
+                progress=False,
+                threads=True  # per-ticker requests run concurrently inside yfinance
             )
             
             # Process the data to find daily movers
@@ -79,34 +80,40 @@ class StockPriceFetcher:
     
     def _process_price_data(self, data: pd.DataFrame, tickers: List[str]) -> pd.DataFrame:
         """Process raw price data to calculate daily percentage changes."""
-        movers = []
+        if data.empty or not isinstance(data.columns, pd.MultiIndex):
+            return pd.DataFrame()
         
-        for ticker in tickers:
-            try:
-                if ticker not in data.columns.get_level_values(0):
-                    continue
-                    
-                df = data[ticker].copy()
-                if df.empty:
-                    continue
-                    
-                # Calculate daily percentage change
-                df['pct_change'] = df['Close'].pct_change() * 100
-                
-                # Get most recent day's data
-                latest = df.iloc[-1]
-                
-                movers.append({
-                    'ticker': ticker,
-                    'close': latest['Close'],
-                    'pct_change': latest['pct_change'],
-                    'volume': latest['Volume']
-                })
-                
-            except Exception as e:
-                logger.warning(f"Error processing {ticker}: {e}")
+        available = set(data.columns.get_level_values(0))
+        present = [ticker for ticker in tickers if ticker in available]
+        if not present:
+            return pd.DataFrame()
         
-        return pd.DataFrame(movers)
+        # Date x ticker frames, so every ticker is processed in one vectorized
+        # pass. A ticker missing a field gets an all-NaN column rather than
+        # failing the whole universe.
+        close = self._field_frame(data, 'Close', present)
+        volume = self._field_frame(data, 'Volume', present)
+        
+        # Most recent day's close, daily percentage change and volume
+        movers = pd.DataFrame({
+            'ticker': present,
+            'close': close.iloc[-1].to_numpy(),
+            'pct_change': (close.pct_change().iloc[-1] * 100).to_numpy(),
+            'volume': volume.iloc[-1].to_numpy()
+        })
+        
+        # Tickers with no usable closing price are skipped with a warning
+        missing = movers['close'].isna()
+        if missing.any():
+            logger.warning(f"No closing price for {', '.join(movers.loc[missing, 'ticker'])}; skipping")
+        return movers[~missing].reset_index(drop=True)
+    
+    @staticmethod
+    def _field_frame(data: pd.DataFrame, field: str, tickers: List[str]) -> pd.DataFrame:
+        """Date x ticker frame for one price field, NaN where a ticker lacks it."""
+        if field not in data.columns.get_level_values(1):
+            return pd.DataFrame(index=data.index, columns=tickers, dtype=float)
+        return data.xs(field, axis=1, level=1).reindex(columns=tickers)
     
     def _get_mock_movers(self, top_n: int) -> pd.DataFrame:
         """Generate mock data for testing."""
@@ -126,9 +133,10 @@ class StockPriceFetcher:
         
         df = pd.DataFrame(mock_data)
         
-        # Save mock data for reference
-        os.makedirs('data', exist_ok=True)
-        df.to_csv('data/mock_prices.csv', index=False)
+        # Save mock data for reference (the data is constant, so write it once)
+        if not os.path.exists('data/mock_prices.csv'):
+            os.makedirs('data', exist_ok=True)
+            df.to_csv('data/mock_prices.csv', index=False)
         
         # Return top gainers and losers
         top_gainers = df.nlargest(top_n, 'pct_change')
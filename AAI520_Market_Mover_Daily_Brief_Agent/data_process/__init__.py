@@ -5,6 +5,6 @@ Contains all data processing components for analyzing and routing market movemen
 from .identify_movers import MoverAnalyzer
 from .routing import Router
 from .evaluator import EvaluatorOptimizer
-from .sentiment_analyzer import DistilBERTSentimentAnalyzer
+from .sentiment_analyzer import DistilBERTSentimentAnalyzer, get_sentiment_analyzer
 
-__all__ = ['MoverAnalyzer', 'Router', 'EvaluatorOptimizer', 'DistilBERTSentimentAnalyzer']
+__all__ = ['MoverAnalyzer', 'Router', 'EvaluatorOptimizer', 'DistilBERTSentimentAnalyzer', 'get_sentiment_analyzer']
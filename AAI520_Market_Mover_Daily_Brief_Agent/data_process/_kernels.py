@@ -0,0 +1,36 @@
+"""
+Numeric kernels for mover statistics.
+Compiled with numba when it is installed; otherwise they fall back to vectorized numpy.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _nanmean(values: np.ndarray) -> float:
+        """Mean of the non-NaN values (NaN if there are none), like Series.mean()"""
+        total = 0.0
+        count = 0
+        for value in values:
+            if not np.isnan(value):
+                total += value
+                count += 1
+        return total / count if count > 0 else np.nan
+else:
+    def _nanmean(values: np.ndarray) -> float:
+        """Mean of the non-NaN values (NaN if there are none), like Series.mean()"""
+        valid = values[~np.isnan(values)]
+        return float(valid.mean()) if valid.size else np.nan
+
+
+def _breadth(gain_pct: np.ndarray, loss_pct: np.ndarray):
+    """Return (average gain, average loss) in percent; NaN for a side with no values."""
+    return _nanmean(gain_pct), _nanmean(loss_pct)
+
+
+breadth_kernel = njit(cache=True)(_breadth) if njit is not None else _breadth
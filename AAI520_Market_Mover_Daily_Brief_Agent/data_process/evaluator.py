@@ -5,13 +5,16 @@ import logging
 from typing import Dict, List, Any, Tuple
 import pandas as pd
 from datetime import datetime, timedelta
-import json
 import os
+import orjson
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Evaluation details can carry numpy scalars (e.g. pct_change from pandas)
+JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
 class EvaluatorOptimizer:
     """
     Evaluates the accuracy of detected reasons for stock movements
@@ -21,6 +24,7 @@ class EvaluatorOptimizer:
     def __init__(self, data_dir: str = 'data'):
         self.data_dir = data_dir
         self.history_file = os.path.join(data_dir, 'evaluation_history.json')
+        self.metrics_file = os.path.join(data_dir, 'performance_metrics.json')
         self.performance_metrics = self._load_performance_metrics()
         
         # Initialize default weights for different analysis types
@@ -33,13 +37,16 @@ class EvaluatorOptimizer:
         
         # Load historical data if available
         self.history = self._load_history()
+        
+        # History state the current weights were optimized for
+        self._optimized_for = None
     
     def _load_history(self) -> List[Dict[str, Any]]:
         """Load evaluation history from file."""
         try:
             if os.path.exists(self.history_file):
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
+                with open(self.history_file, 'rb') as f:
+                    return orjson.loads(f.read())
         except Exception as e:
             logger.warning(f"Failed to load evaluation history: {e}")
         return []
@@ -48,18 +55,23 @@ class EvaluatorOptimizer:
         """Save evaluation history to file."""
         try:
             os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-            with open(self.history_file, 'w') as f:
-                json.dump(self.history[-100:], f)  # Keep only last 100 entries
+            tmp_file = self.history_file + '.tmp'
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(self.history[-100:], option=JSON_OPTIONS))  # Keep only last 100 entries
+                os.replace(tmp_file, self.history_file)  # atomic: never leave a truncated history
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
         except Exception as e:
             logger.error(f"Failed to save evaluation history: {e}")
     
     def _load_performance_metrics(self) -> Dict[str, Dict[str, float]]:
         """Load or initialize performance metrics."""
-        metrics_file = os.path.join(self.data_dir, 'performance_metrics.json')
         try:
-            if os.path.exists(metrics_file):
-                with open(metrics_file, 'r') as f:
-                    return json.load(f)
+            if os.path.exists(self.metrics_file):
+                with open(self.metrics_file, 'rb') as f:
+                    return orjson.loads(f.read())
         except Exception as e:
             logger.warning(f"Failed to load performance metrics: {e}")
         
@@ -75,9 +87,14 @@ class EvaluatorOptimizer:
         """Save performance metrics to file."""
         try:
             os.makedirs(self.data_dir, exist_ok=True)
-            metrics_file = os.path.join(self.data_dir, 'performance_metrics.json')
-            with open(metrics_file, 'w') as f:
-                json.dump(self.performance_metrics, f)
+            tmp_file = self.metrics_file + '.tmp'
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(self.performance_metrics, option=JSON_OPTIONS))
+                os.replace(tmp_file, self.metrics_file)
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
         except Exception as e:
             logger.error(f"Failed to save performance metrics: {e}")
     
@@ -182,23 +199,30 @@ class EvaluatorOptimizer:
         if not self.history:
             return
         
+        # History only grows through evaluate(); skip the rescan when nothing
+        # has been appended since the last optimization
+        history_key = (len(self.history), self.history[-1].get('timestamp'))
+        if history_key == self._optimized_for:
+            return self.weights
+        
         # Simple optimization: increase weights for categories with high accuracy
         category_scores = {}
         
-        # Analyze history to find which categories perform best
+        # Analyze history to find which categories perform best, tallying
+        # every category in a single pass
+        correct = {'earnings': 0, 'macro': 0, 'news': 0}
+        total = dict(correct)
+        for eval_item in self.history:
+            for detail in eval_item.get('details', []):
+                category = detail.get('category')
+                if category in total:
+                    total[category] += 1
+                    if detail.get('correct_direction', False):
+                        correct[category] += 1
+        
         for category in ['earnings', 'macro', 'news']:
-            correct = 0
-            total = 0
-            
-            for eval_item in self.history:
-                for detail in eval_item.get('details', []):
-                    if detail.get('category') == category:
-                        total += 1
-                        if detail.get('correct_direction', False):
-                            correct += 1
-            
-            if total > 0:
-                accuracy = correct / total
+            if total[category] > 0:
+                accuracy = correct[category] / total[category]
                 category_scores[category] = accuracy
         
         # Update weights based on performance
@@ -209,6 +233,7 @@ class EvaluatorOptimizer:
                     # Normalize to 0.5-1.5 range
                     self.weights[category] = 0.5 + (score / max_score)
         
+        self._optimized_for = history_key
         logger.info(f"Updated analysis weights: {self.weights}")
         return self.weights
     
@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 import logging
+from ._kernels import breadth_kernel
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -70,13 +71,18 @@ class MoverAnalyzer:
         gainers = movers_data.get('gainers', pd.DataFrame())
         losers = movers_data.get('losers', pd.DataFrame())
         
+        avg_gain, avg_loss = breadth_kernel(
+            gainers['pct_change'].to_numpy(dtype=np.float64) if not gainers.empty else np.empty(0),
+            losers['pct_change'].to_numpy(dtype=np.float64) if not losers.empty else np.empty(0)
+        )
+        
         summary = {
             'total_gainers': len(gainers),
             'total_losers': len(losers),
             'top_gainer': gainers.iloc[0].to_dict() if not gainers.empty else None,
             'top_loser': losers.iloc[0].to_dict() if not losers.empty else None,
-            'avg_gain': gainers['pct_change'].mean() if not gainers.empty else 0,
-            'avg_loss': losers['pct_change'].mean() if not losers.empty else 0,
+            'avg_gain': avg_gain if not gainers.empty else 0,
+            'avg_loss': avg_loss if not losers.empty else 0,
             'total_volume': {
                 'gainers': gainers['volume'].sum() if not gainers.empty else 0,
                 'losers': losers['volume'].sum() if not losers.empty else 0
@@ -106,9 +112,8 @@ class MoverAnalyzer:
             'JNJ': 'Healthcare', 'PFE': 'Healthcare', 'MRK': 'Healthcare'
         }
         
-        # Count by sector
-        sectors = [sector_map.get(ticker, 'Other') for ticker in df['ticker']]
-        return pd.Series(sectors).value_counts().to_dict()
+        # Count by sector (mapped column-wise instead of through a Python list)
+        return df['ticker'].map(sector_map).fillna('Other').value_counts().to_dict()
 
 if __name__ == "__main__":
     # Example usage
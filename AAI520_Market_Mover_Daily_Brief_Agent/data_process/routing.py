@@ -19,6 +19,17 @@ class AnalysisType(Enum):
     NEWS = auto()
     UNKNOWN = auto()
 
+# Result bucket for each analysis type
+_ROUTE = {
+    AnalysisType.EARNINGS: 'earnings',
+    AnalysisType.MACRO: 'macro',
+    AnalysisType.NEWS: 'news',
+    AnalysisType.UNKNOWN: 'unknown'
+}
+
+# Shared default for missing mover groups (never mutated)
+_EMPTY_MOVERS = pd.DataFrame(columns=['ticker', 'pct_change'])
+
 @dataclass
 class MoveAnalysis:
     """Container for analysis results of a stock movement."""
@@ -57,6 +68,13 @@ class Router:
             'central bank', 'policy', 'trade war', 'tariff', 'economic data', 'jobs report',
             'manufacturing index', 'retail sales', 'housing market', 'consumer confidence'
         ]
+        
+        # Single-word keywords are matched by set membership against the
+        # content's tokens; only multi-word phrases need a substring search
+        self._earnings_words = frozenset(kw for kw in self.earnings_keywords if ' ' not in kw)
+        self._earnings_phrases = tuple(kw for kw in self.earnings_keywords if ' ' in kw)
+        self._macro_words = frozenset(kw for kw in self.macro_keywords if ' ' not in kw)
+        self._macro_phrases = tuple(kw for kw in self.macro_keywords if ' ' in kw)
     
     def analyze_movement(self, ticker: str, move_type: str, pct_change: float, 
                         related_news: List[Dict[str, Any]]) -> MoveAnalysis:
@@ -75,9 +93,13 @@ class Router:
         for news in related_news:
             content = f"{news.get('title', '')} {news.get('description', '')} {news.get('content', '')}".lower()
             
+            tokens = set(re.findall(r"[a-z]+", content))
+            
             # Check for earnings-related content
-            earnings_score = sum(1 for kw in self.earnings_keywords if kw in content)
-            macro_score = sum(1 for kw in self.macro_keywords if kw in content)
+            earnings_score = (len(tokens & self._earnings_words) +
+                              sum(1 for kw in self._earnings_phrases if kw in content))
+            macro_score = (len(tokens & self._macro_words) +
+                           sum(1 for kw in self._macro_phrases if kw in content))
             
             if earnings_score > 0 or macro_score > 0:
                 reason = {
@@ -115,49 +137,28 @@ class Router:
             'unknown': []
         }
         
-        # Process gainers
-        for _, row in movers.get('gainers', pd.DataFrame()).iterrows():
-            ticker = row['ticker']
-            related_news = [n for n in news_data if ticker in n.get('tickers', [])]
-            
-            analysis = self.analyze_movement(
-                ticker=ticker,
-                move_type='gainer',
-                pct_change=row['pct_change'],
-                related_news=related_news
-            )
-            
-            # Route to appropriate category
-            if analysis.analysis_type == AnalysisType.EARNINGS:
-                results['earnings'].append(analysis.to_dict())
-            elif analysis.analysis_type == AnalysisType.MACRO:
-                results['macro'].append(analysis.to_dict())
-            elif analysis.analysis_type == AnalysisType.NEWS:
-                results['news'].append(analysis.to_dict())
-            else:
-                results['unknown'].append(analysis.to_dict())
+        # Index news by ticker once instead of rescanning it for every mover
+        news_by_ticker = {}
+        for news in news_data:
+            for ticker in news.get('tickers', ()):
+                news_by_ticker.setdefault(ticker, []).append(news)
         
-        # Process losers (similar to gainers)
-        for _, row in movers.get('losers', pd.DataFrame()).iterrows():
-            ticker = row['ticker']
-            related_news = [n for n in news_data if ticker in n.get('tickers', [])]
-            
-            analysis = self.analyze_movement(
-                ticker=ticker,
-                move_type='loser',
-                pct_change=row['pct_change'],
-                related_news=related_news
-            )
-            
-            # Route to appropriate category
-            if analysis.analysis_type == AnalysisType.EARNINGS:
-                results['earnings'].append(analysis.to_dict())
-            elif analysis.analysis_type == AnalysisType.MACRO:
-                results['macro'].append(analysis.to_dict())
-            elif analysis.analysis_type == AnalysisType.NEWS:
-                results['news'].append(analysis.to_dict())
-            else:
-                results['unknown'].append(analysis.to_dict())
+        # Process gainers, then losers. Columns are pulled out once as plain
+        # lists rather than building a Series per row with iterrows()
+        for move_type, key in (('gainer', 'gainers'), ('loser', 'losers')):
+            df = movers.get(key, _EMPTY_MOVERS)
+            if df.empty:
+                continue
+            for ticker, pct_change in zip(df['ticker'].tolist(), df['pct_change'].tolist()):
+                analysis = self.analyze_movement(
+                    ticker=ticker,
+                    move_type=move_type,
+                    pct_change=pct_change,
+                    related_news=news_by_ticker.get(ticker, [])
+                )
+                
+                # Route to appropriate category
+                results[_ROUTE[analysis.analysis_type]].append(analysis.to_dict())
         
         return results
 
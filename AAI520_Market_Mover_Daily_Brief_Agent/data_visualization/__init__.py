@@ -2,8 +2,8 @@
 Data Visualization Module
 Contains all frontend visualization components including dashboards
 """
-from .simple_dashboard import app, socketio
+from .simple_dashboard import app, socketio, initialize_dashboard
 
-__all__ = ['app', 'socketio']
+__all__ = ['app', 'socketio', 'initialize_dashboard']
 
 
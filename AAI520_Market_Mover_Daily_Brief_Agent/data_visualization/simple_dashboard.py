@@ -2,6 +2,12 @@
 Market Movers Dashboard
 A real-time dashboard showing stock market movers and news
 """
+if __name__ == '__main__':
+    # Run directly: patch the standard library for cooperative sockets before
+    # Flask is imported (main.py does the same). Importing this module never patches.
+    import eventlet
+    eventlet.monkey_patch()
+
 import sys
 from pathlib import Path
 
@@ -9,28 +15,60 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from flask import Flask, render_template, jsonify, request
-from flask_socketio import SocketIO
+from flask import Flask, Response, render_template, jsonify, request
+from flask.json.provider import JSONProvider
+from flask_socketio import SocketIO, join_room
+import orjson
 import os
 from datetime import datetime
 import time
-from threading import Thread, Lock
+from threading import Lock
+from concurrent.futures import Future
+from collections import deque
 import logging
+from eventlet import tpool
 from data_fetch.data_fetcher import DataFetcher
 
+__all__ = ['app', 'socketio', 'initialize_dashboard']
+
 # Configure logging
 logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'))
 logger = logging.getLogger(__name__)
 
+# orjson handles numpy values and naive datetimes directly
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=ORJSON_OPTIONS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class OrjsonCodec:
+    """json-module stand-in for python-socketio (accepts and ignores json kwargs)"""
+    
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return orjson.dumps(obj, option=ORJSON_OPTIONS).decode('utf-8')
+    
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__, 
             static_folder='static',
             template_folder='templates')
 app.config['SECRET_KEY'] = 'your-secret-key-here'
+app.json = OrjsonProvider(app)
 
 # Initialize Socket.IO with CORS enabled
 socketio = SocketIO(app, 
-                   async_mode='threading',
+                   async_mode='eventlet',
+                   json=OrjsonCodec,
                    cors_allowed_origins="*",
                    logger=True,
                    engineio_logger=True)
@@ -38,23 +76,113 @@ socketio = SocketIO(app,
 # Initialize data fetcher
 data_fetcher = DataFetcher()
 
-# Global variable to store market data
+# Latest market data snapshot and its JSON encoding, published together in a
+# single-slot deque. append() and [0] are atomic, so the writer swaps the pair
+# in one step and readers always get a matching dict/bytes pair without a lock.
+_market_slot = deque(maxlen=1)
+
+def publish_market_data(new_data):
+    """Publish a new market data snapshot together with its encoded JSON"""
+    _market_slot.append((new_data, orjson.dumps(new_data, option=ORJSON_OPTIONS)))
 
-# Global state with thread safety
-global market_data
-market_data = {
+def current_market_data():
+    """Return the latest published market data snapshot"""
+    return _market_slot[0][0]
+
+publish_market_data({
     'gainers': [],
     'losers': [],
     'market_health': 'neutral',
     'last_updated': None,
-    'news': []
-}
+    'news': [],
+    'loading': True  # Cleared by the first refresh
+})
 
-# Thread lock for thread safety
-data_lock = Lock()
+class ResponseCache:
+    """Bounded TTL cache for API responses.
+    
+    Concurrent misses for the same key wait on a per-key lock so only one
+    of them calls upstream; the rest are served the freshly cached value.
+    """
+    
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = {}  # key -> (fetched_at, value)
+        self._key_locks = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _lookup(self, key):
+        """Return (True, value) for a fresh entry, else (False, None). Caller holds _lock."""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return True, entry[1]
+        return False, None
+    
+    def get_or_fetch(self, key, fetch_fn):
+        """Return the cached value for key, calling fetch_fn on a miss"""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            key_lock = self._key_locks.setdefault(key, Lock())
+        
+        with key_lock:
+            # Another request may have filled the entry while we waited
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self.hits += 1
+                    return value
+                self.misses += 1
+            
+            stored = False
+            try:
+                value = fetch_fn()
+                
+                # Only cache usable results so failures are retried
+                if value:
+                    with self._lock:
+                        self._entries.pop(key, None)
+                        if len(self._entries) >= self.maxsize:
+                            # Evict the oldest entry (dicts keep insertion order)
+                            oldest = next(iter(self._entries))
+                            del self._entries[oldest]
+                            self._key_locks.pop(oldest, None)
+                        self._entries[key] = (time.monotonic(), value)
+                        stored = True
+                return value
+            finally:
+                # Keys with no entry (e.g. unknown symbols) must not keep a lock
+                if not stored:
+                    with self._lock:
+                        if self._key_locks.get(key) is key_lock:
+                            del self._key_locks[key]
+    
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+# Response cache for the per-symbol historical data endpoint (ticker news is
+# already cached by DataFetcher with its own TTL)
+historical_cache = ResponseCache(maxsize=512, ttl=3600)
 
 def fetch_market_data():
     """Fetch real market data from APIs"""
+    # Take the clock once per refresh; every timestamp below derives from it
+    now = datetime.now()
+    timestamp = now.isoformat(sep=' ', timespec='seconds')
+    
     try:
         # Fetch stock data
         gainers, losers = data_fetcher.get_stock_data()
@@ -91,7 +219,7 @@ def fetch_market_data():
                     'title': 'Market Update: Major indices show mixed results',
                     'description': 'Stocks showed mixed results in today\'s trading session...',
                     'url': '#',
-                    'publishedAt': datetime.now().isoformat(),
+                    'publishedAt': now.isoformat(),
                     'source': {'name': 'Market News'},
                     'sentiment': 'neutral',
                     'sentiment_score': 0.5,
@@ -108,44 +236,58 @@ def fetch_market_data():
             'gainers': gainers[:10],  # Limit to top 10
             'losers': losers[:10],    # Limit to top 10
             'market_health': market_health,
-            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'last_updated': timestamp,
             'news': news[:5]  # Limit to 5 news items
         }
     except Exception as e:
         logger.error(f"Error fetching market data: {str(e)}")
         # Return current data if available, or empty data if not
-        with data_lock:
-            return market_data if any(market_data.values()) else {
-                'gainers': [],
-                'losers': [],
-                'market_health': 'neutral',
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'news': []
-            }
+        snapshot = current_market_data()
+        return snapshot if any(snapshot.values()) else {
+            'gainers': [],
+            'losers': [],
+            'market_health': 'neutral',
+            'last_updated': timestamp,
+            'news': []
+        }
+
+# Socket.IO room every dashboard client joins for market broadcasts
+MARKET_ROOM = 'market'
+
+def broadcast_market_delta(old_data, new_data, skip_sid=None):
+    """Emit only the top-level keys that changed to the market room.
+    
+    Keys removed from the new snapshot are sent as None so clients drop them.
+    Nothing is sent when only the timestamp changed.
+    """
+    delta = {k: v for k, v in new_data.items() if v != old_data.get(k)}
+    delta.update({k: None for k in old_data.keys() - new_data.keys()})
+    if delta.keys() - {'last_updated'}:
+        socketio.emit('market_delta', delta, to=MARKET_ROOM, skip_sid=skip_sid)
 
 def background_thread():
     """Background thread to update market data"""
     while True:
         try:
-            # Fetch new data
-            new_data = fetch_market_data()
+            # Fetch new data. Model inference and pandas parsing run on an OS
+            # thread so the event loop keeps serving clients meanwhile.
+            old_data = current_market_data()
+            new_data = tpool.execute(fetch_market_data)
             
-            # Update global state with thread safety
-            with data_lock:
-                global market_data
-                market_data = new_data
+            # Publish the new snapshot
+            publish_market_data(new_data)
             
-            # Emit update to all connected clients
-            socketio.emit('market_update', new_data)
-            logger.info(f"Market data updated at {datetime.now().strftime('%H:%M:%S')}")
+            # Send connected clients what changed
+            broadcast_market_delta(old_data, new_data)
+            logger.info(f"Market data updated at {new_data.get('last_updated')}")
             
             # Wait for next update (5 minutes)
-            time.sleep(300)
+            socketio.sleep(300)
             
         except Exception as e:
             logger.error(f"Error in background thread: {str(e)}")
             # Wait a bit before retrying
-            time.sleep(60)
+            socketio.sleep(60)
 
 @app.route('/')
 def index():
@@ -163,7 +305,10 @@ def get_historical_data():
     
     try:
         # Fetch historical data
-        data = data_fetcher.get_historical_data(symbol, period=period)
+        data = historical_cache.get_or_fetch(
+            (symbol, period),
+            lambda: data_fetcher.get_historical_data(symbol, period=period)
+        )
         
         if not data:
             return jsonify({'error': f'No data available for {symbol}'}), 404
@@ -177,8 +322,8 @@ def get_historical_data():
 @app.route('/api/market-data')
 def get_market_data():
     """API endpoint to get current market data"""
-    with data_lock:
-        return jsonify(market_data)
+    market_json = _market_slot[0][1]
+    return Response(market_json, mimetype='application/json')
 
 @app.route('/api/ticker-news')
 def get_ticker_news():
@@ -202,72 +347,146 @@ def get_ticker_news():
         app.logger.error(f"Error fetching news for {ticker}: {str(e)}")
         return jsonify({'error': 'Failed to fetch ticker news'}), 500
 
+@app.route('/api/cache-stats')
+def get_cache_stats():
+    """Debug endpoint reporting API response cache usage"""
+    return jsonify({
+        'historical_data': historical_cache.stats()
+    })
+
 @socketio.on('connect')
 def handle_connect():
     """Handle new WebSocket connection"""
     print('Client connected')
-    # Send current market data to the newly connected client
-    with data_lock:
-        socketio.emit('market_update', market_data)
+    initialize_dashboard()
+    join_room(MARKET_ROOM)
+    # Send current market data to the newly connected client only
+    snapshot = current_market_data()
+    socketio.emit('market_update', snapshot, to=request.sid)
 
 @socketio.on('request_initial_data')
 def handle_initial_data():
     """Handle initial data request from client"""
     print('Initial data requested by client')
-    with data_lock:
-        socketio.emit('initial_data', market_data)
+    snapshot = current_market_data()
+    socketio.emit('initial_data', snapshot, to=request.sid)
+
+def fetch_and_emit_historical(sid, symbol, period):
+    """Fetch historical data in the background and emit it to one client"""
+    payload = {'symbol': symbol, 'period': period}
+    try:
+        data = historical_cache.get_or_fetch(
+            (symbol, period),
+            lambda: data_fetcher.get_historical_data(symbol, period=period)
+        )
+        if data:
+            payload['data'] = data
+        else:
+            payload['error'] = f'No data available for {symbol}'
+    except Exception as e:
+        logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
+        payload['error'] = 'Failed to fetch historical data'
+    socketio.emit('historical_data', payload, to=sid)
+
+@socketio.on('request_historical')
+def handle_historical_request(params):
+    """Handle chart data requests without blocking the Socket.IO handler"""
+    params = params or {}
+    symbol = str(params.get('symbol', '')).upper()
+    period = params.get('period', '1mo')
+    
+    if not symbol:
+        socketio.emit('historical_data', {'symbol': symbol, 'period': period,
+                                          'error': 'Symbol parameter is required'}, to=request.sid)
+        return
+    
+    socketio.start_background_task(fetch_and_emit_historical, request.sid, symbol, period)
+
+# Manual refreshes are single-flight: concurrent requests share one fetch, and
+# a refresh that finished less than MIN_REFRESH_INTERVAL seconds ago is reused
+MIN_REFRESH_INTERVAL = 10
+_refresh_lock = Lock()
+_refresh_inflight = None  # Future for the refresh currently running
+_last_refresh = float('-inf')  # monotonic time the last manual refresh finished
+
+def refresh_market_data(requester_sid=None):
+    """Fetch and publish fresh market data, coalescing concurrent callers"""
+    global _refresh_inflight, _last_refresh
+    with _refresh_lock:
+        if _refresh_inflight is None and time.monotonic() - _last_refresh < MIN_REFRESH_INTERVAL:
+            return current_market_data()
+        is_leader = _refresh_inflight is None
+        if is_leader:
+            _refresh_inflight = Future()
+        future = _refresh_inflight
+    
+    if is_leader:
+        try:
+            old_data = current_market_data()
+            new_data = tpool.execute(fetch_market_data)
+            publish_market_data(new_data)
+            # The requester gets the full snapshot; everyone else gets the changes
+            broadcast_market_delta(old_data, new_data, skip_sid=requester_sid)
+            future.set_result(new_data)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with _refresh_lock:
+                _refresh_inflight = None
+                _last_refresh = time.monotonic()
+    
+    return future.result(timeout=30)
 
 @socketio.on('request_update')
 def handle_update_request():
     """Handle manual update requests"""
     print('Update requested by client')
-    # Fetch fresh data and send update
+    # Fetch fresh data (or join a refresh already in flight) and send update
     try:
-        new_data = fetch_market_data()
-        with data_lock:
-            global market_data
-            market_data = new_data
-        socketio.emit('market_update', new_data)
+        new_data = refresh_market_data(requester_sid=request.sid)
+        socketio.emit('market_update', new_data, to=request.sid)
     except Exception as e:
         print(f'Error handling update request: {str(e)}')
-        with data_lock:
-            socketio.emit('market_update', market_data)
+        snapshot = current_market_data()
+        socketio.emit('market_update', snapshot, to=request.sid)
+
+# Background refresh is started lazily so importing this module stays cheap
+_initialized = False
+_init_lock = Lock()
 
-# Initialize data and background thread when module is loaded
 def initialize_dashboard():
-    """Initialize the dashboard with data and background thread"""
+    """Start the background refresh task once; its first refresh runs immediately"""
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        _initialized = True
+    
     try:
-        # Fetch initial data
-        logger.info("Fetching initial market data...")
-        initial_data = fetch_market_data()
-        with data_lock:
-            global market_data
-            market_data = initial_data
-            logger.info(f"Initial data loaded: {len(market_data.get('gainers', []))} gainers, {len(market_data.get('losers', []))} losers")
-        
-        # Start background thread
+        # Start background task on the Socket.IO event loop
         logger.info("Starting background thread...")
-        thread = Thread(target=background_thread)
-        thread.daemon = True
-        thread.start()
+        socketio.start_background_task(background_thread)
         logger.info("Dashboard initialized successfully")
         
     except Exception as e:
         logger.error(f"Error initializing dashboard: {str(e)}")
 
-# Initialize when module is imported
-initialize_dashboard()
+@app.before_request
+def ensure_dashboard_initialized():
+    """Warm up market data on the first HTTP request"""
+    initialize_dashboard()
 
 if __name__ == '__main__':
     try:
-        # Run the app
+        # Run the app (debug off, as in main.py: the debugger middleware
+        # must not be reachable)
         logger.info("Starting Socket.IO server...")
-        socketio.run(app, 
-                    host='0.0.0.0', 
-                    port=5000, 
-                    debug=True, 
-                    use_reloader=False,
-                    allow_unsafe_werkzeug=True)
+        initialize_dashboard()
+        socketio.run(app,
+                    host='0.0.0.0',
+                    port=5000,
+                    debug=False,
+                    use_reloader=False)
         
     except KeyboardInterrupt:
         logger.info("\nShutting down...")
@@ -4,12 +4,20 @@ Market Movers Daily Brief Generator
 Generates comprehensive daily market briefs with AI-powered sentiment analysis
 and saves results in multiple formats (JSON, Markdown, HTML, CSV)
 """
+import os
 import sys
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from types import MappingProxyType
 from typing import Dict, List, Any
-import json
 import csv
+import gzip
+import io
+import orjson
+import numpy as np
 
 # Add project root to path
 project_root = Path(__file__).parent
@@ -26,14 +34,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# orjson options for saved briefs (numpy scalars can leak in from pandas)
+BRIEF_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Ticker -> sector lookup (read-only)
+SECTOR_MAP = MappingProxyType({
+    'AAPL': 'Technology', 'MSFT': 'Technology', 'GOOGL': 'Technology',
+    'AMZN': 'Consumer Cyclical', 'META': 'Technology', 'TSLA': 'Consumer Cyclical',
+    'NVDA': 'Technology', 'JPM': 'Financial Services', 'V': 'Financial Services',
+    'JNJ': 'Healthcare', 'WMT': 'Consumer Defensive', 'NFLX': 'Communication Services',
+    'AMD': 'Technology', 'INTC': 'Technology'
+})
+
+# Integer sector ids for counting with np.bincount; id 0 is 'Other'
+SECTOR_NAMES = ('Other',) + tuple(dict.fromkeys(SECTOR_MAP.values()))
+SECTOR_IDS = MappingProxyType({symbol: SECTOR_NAMES.index(sector) for symbol, sector in SECTOR_MAP.items()})
+
 
 class MarketBriefAgent:
     """AI-Powered Market Brief Generator"""
     
-    def __init__(self, output_dir: str = './output', enable_evaluation: bool = True):
+    def __init__(self, output_dir: str = './output', enable_evaluation: bool = True, pretty_json: bool = False):
         self.data_fetcher = DataFetcher()
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        # Also write an indented market_brief_<date>.json next to the gzip archive
+        self.pretty_json = pretty_json
         
         # Initialize evaluator for performance tracking
         self.enable_evaluation = enable_evaluation
@@ -45,13 +71,13 @@ class MarketBriefAgent:
         else:
             self.evaluator = None
         
-        self.sector_map = {
-            'AAPL': 'Technology', 'MSFT': 'Technology', 'GOOGL': 'Technology',
-            'AMZN': 'Consumer Cyclical', 'META': 'Technology', 'TSLA': 'Consumer Cyclical',
-            'NVDA': 'Technology', 'JPM': 'Financial Services', 'V': 'Financial Services',
-            'JNJ': 'Healthcare', 'WMT': 'Consumer Defensive', 'NFLX': 'Communication Services',
-            'AMD': 'Technology', 'INTC': 'Technology'
-        }
+        self.sector_map = SECTOR_MAP
+    
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _get_sector(symbol: str) -> str:
+        """Look up the sector for a ticker (cached per symbol)"""
+        return SECTOR_MAP.get(symbol, 'Other')
     
     def generate_daily_brief(self, save_outputs: bool = True, evaluate_previous: bool = True) -> Dict[str, Any]:
         """Generate comprehensive daily market brief
@@ -83,12 +109,18 @@ class MarketBriefAgent:
         if losers:
             top_tickers.extend([l['symbol'] for l in losers[:2]])
         
-        news = self.data_fetcher.get_news(tickers=top_tickers if top_tickers else None)
+        # Evaluate previous day's predictions (if enabled) on a worker thread
+        # while news is fetched and scored; the two are independent
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            evaluation_future = None
+            if evaluate_previous and self.evaluator:
+                evaluation_future = pool.submit(self._evaluate_previous_predictions, date_str, gainers, losers)
+            
+            news = self.data_fetcher.get_news(tickers=top_tickers if top_tickers else None)
+            
+            evaluation_results = evaluation_future.result() if evaluation_future else None
         
-        # Evaluate previous day's predictions (if enabled)
-        evaluation_results = None
-        if evaluate_previous and self.evaluator:
-            evaluation_results = self._evaluate_previous_predictions(date_str)
+        biggest_gainer, biggest_loser = self._mover_extremes(gainers, losers)
         
         # Generate brief
         brief = {
@@ -98,12 +130,12 @@ class MarketBriefAgent:
                 'version': '3.1',
                 'evaluation_enabled': self.enable_evaluation
             },
-            'market_overview': self._generate_overview(gainers, losers, market_health),
+            'market_overview': self._generate_overview(gainers, losers, market_health, biggest_gainer, biggest_loser),
             'top_gainers': self._analyze_movers(gainers[:10], 'gainer'),
             'top_losers': self._analyze_movers(losers[:10], 'loser'),
             'news_analysis': self._analyze_news(news),
             'sector_analysis': self._analyze_sectors(gainers, losers),
-            'key_insights': self._generate_insights(gainers, losers, news, market_health),
+            'key_insights': self._generate_insights(gainers, losers, market_health, biggest_gainer),
             'recommendations': self._generate_recommendations(gainers, losers, market_health)
         }
         
@@ -118,25 +150,33 @@ class MarketBriefAgent:
         logger.info("Brief generation complete!")
         return brief
     
-    def _generate_overview(self, gainers, losers, market_health):
+    @staticmethod
+    def _mover_extremes(gainers, losers):
+        """Find the biggest gainer and biggest loser once, for the overview and insights"""
+        return (max(gainers, key=lambda x: x['change']) if gainers else None,
+                min(losers, key=lambda x: x['change']) if losers else None)
+    
+    def _generate_overview(self, gainers, losers, market_health, biggest_gainer, biggest_loser):
         total = len(gainers) + len(losers)
         return {
             'market_health': market_health,
             'total_gainers': len(gainers),
             'total_losers': len(losers),
             'advance_decline_ratio': round(len(gainers) / total, 2) if total > 0 else 0,
-            'biggest_gainer': max(gainers, key=lambda x: x['change']) if gainers else None,
-            'biggest_loser': min(losers, key=lambda x: x['change']) if losers else None
+            'biggest_gainer': biggest_gainer,
+            'biggest_loser': biggest_loser
         }
     
-    def _analyze_movers(self, movers, mover_type):
+    @classmethod
+    def _analyze_movers(cls, movers, mover_type):
+        """Ranked mover entries in the saved-brief schema (also used by agentic_flow)"""
         return [{
             'rank': i + 1,
             'symbol': m['symbol'],
             'price': m['price'],
             'change_percent': m['change'],
             'volume': m['volume'],
-            'sector': self.sector_map.get(m['symbol'], 'Other'),
+            'sector': cls._get_sector(m['symbol']),
             'type': mover_type
         } for i, m in enumerate(movers)]
     
@@ -155,24 +195,25 @@ class MarketBriefAgent:
         }
     
     def _analyze_sectors(self, gainers, losers):
-        sector_perf = {}
-        for m in gainers + losers:
-            sector = self.sector_map.get(m['symbol'], 'Other')
-            if sector not in sector_perf:
-                sector_perf[sector] = {'gainers': 0, 'losers': 0}
-            if m in gainers:
-                sector_perf[sector]['gainers'] += 1
-            else:
-                sector_perf[sector]['losers'] += 1
+        sector_ids = np.fromiter(
+            (SECTOR_IDS.get(m['symbol'], 0) for m in chain(gainers, losers)),
+            dtype=np.int8, count=len(gainers) + len(losers)
+        )
+        gainer_counts = np.bincount(sector_ids[:len(gainers)], minlength=len(SECTOR_NAMES)).tolist()
+        loser_counts = np.bincount(sector_ids[len(gainers):], minlength=len(SECTOR_NAMES)).tolist()
+        sector_perf = {
+            SECTOR_NAMES[i]: {'gainers': g, 'losers': l}
+            for i, (g, l) in enumerate(zip(gainer_counts, loser_counts))
+            if g or l
+        }
         return {'sector_performance': sector_perf}
     
-    def _generate_insights(self, gainers, losers, news, market_health):
+    def _generate_insights(self, gainers, losers, market_health, top):
         insights = []
         total = len(gainers) + len(losers)
         if total > 0:
             insights.append(f"Market shows {market_health} sentiment with {len(gainers)}/{total} stocks advancing")
-        if gainers:
-            top = max(gainers, key=lambda x: x['change'])
+        if top:
             insights.append(f"{top['symbol']} led with +{top['change']:.2f}%")
         return insights
     
@@ -189,49 +230,105 @@ class MarketBriefAgent:
     def _save_all_formats(self, brief, date_str):
         logger.info("Saving outputs...")
         
-        # JSON
-        json_path = self.output_dir / f"market_brief_{date_str}.json"
-        with open(json_path, 'w') as f:
-            json.dump(brief, f, indent=2)
-        logger.info(f"✅ Saved: {json_path}")
+        # Renderers run on the writer threads, so a format that cannot be
+        # built from this brief fails on its own without blocking the others
+        outputs = {
+            # Compact JSON archive (compresslevel=1: most of the size win, little CPU)
+            self.output_dir / f"market_brief_{date_str}.json.gz":
+                lambda: gzip.compress(orjson.dumps(brief, option=BRIEF_JSON_OPTIONS), compresslevel=1),
+            # Evaluation summary (only what the next day's evaluation reads)
+            self.output_dir / f"market_brief_{date_str}.summary.json":
+                lambda: orjson.dumps(self._evaluation_summary(brief), option=orjson.OPT_SERIALIZE_NUMPY),
+            # Markdown
+            self.output_dir / f"market_brief_{date_str}.md":
+                lambda: self._format_markdown(brief),
+            # CSV
+            self.output_dir / f"movers_{date_str}.csv":
+                lambda: self._format_csv(brief),
+        }
+        if self.pretty_json:
+            outputs[self.output_dir / f"market_brief_{date_str}.json"] = \
+                lambda: orjson.dumps(brief, option=BRIEF_JSON_OPTIONS | orjson.OPT_INDENT_2)
         
-        # Markdown
-        md_path = self.output_dir / f"market_brief_{date_str}.md"
-        with open(md_path, 'w') as f:
-            f.write(self._format_markdown(brief))
-        logger.info(f"✅ Saved: {md_path}")
+        # The files are independent, so write them concurrently
+        with ThreadPoolExecutor(max_workers=len(outputs)) as pool:
+            futures = {path: pool.submit(self._write_atomic, path, render) for path, render in outputs.items()}
         
-        # CSV
-        csv_path = self.output_dir / f"movers_{date_str}.csv"
-        with open(csv_path, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=['rank', 'symbol', 'type', 'price', 'change_percent', 'volume', 'sector'])
-            writer.writeheader()
-            writer.writerows(brief['top_gainers'] + brief['top_losers'])
-        logger.info(f"✅ Saved: {csv_path}")
+        # Report every file first, then fail the save if any of them failed
+        failed = []
+        for path, future in futures.items():
+            try:
+                future.result()
+                logger.info(f"✅ Saved: {path}")
+            except Exception as e:
+                logger.error(f"Failed to save {path}: {str(e)}")
+                failed.append(str(path))
+        if failed:
+            raise OSError(f"Failed to save {len(failed)} output file(s): {', '.join(failed)}")
+    
+    @staticmethod
+    def _write_atomic(path: Path, render):
+        """Render a payload and move it into place, so readers never see a partial file"""
+        payload = render()
+        tmp_path = path.with_name(path.name + '.tmp')
+        try:
+            with open(tmp_path, 'wb', buffering=1 << 20) as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)  # only still there if the write failed
+    
+    @staticmethod
+    def _format_csv(brief) -> bytes:
+        buffer = io.StringIO(newline='')
+        writer = csv.DictWriter(buffer, fieldnames=['rank', 'symbol', 'type', 'price', 'change_percent', 'volume', 'sector'])
+        writer.writeheader()
+        writer.writerows(brief['top_gainers'] + brief['top_losers'])
+        return buffer.getvalue().encode('utf-8')
     
-    def _format_markdown(self, brief):
-        md = [f"# Market Brief - {brief['metadata']['date']}\n"]
+    @staticmethod
+    def _evaluation_summary(brief):
+        """Subset of a brief used by _evaluate_previous_predictions"""
+        return {
+            'top_gainers': [{'symbol': m['symbol'], 'change_percent': m['change_percent']}
+                            for m in brief['top_gainers']],
+            'top_losers': [{'symbol': m['symbol'], 'change_percent': m['change_percent']}
+                           for m in brief['top_losers']],
+            'news_analysis': {'articles': [{'title': a.get('title', '')}
+                                           for a in brief['news_analysis']['articles']]}
+        }
+    
+    def _format_markdown(self, brief) -> bytearray:
+        """Render the markdown brief directly into a UTF-8 buffer"""
+        md = bytearray()
+        
+        def add(line):
+            md.extend(line.encode('utf-8'))
+            md.extend(b'\n')
+        
+        add(f"# Market Brief - {brief['metadata']['date']}\n")
         
         overview = brief['market_overview']
-        md.append(f"## Market Overview\n")
-        md.append(f"- Health: **{overview['market_health'].upper()}**")
-        md.append(f"- Gainers: {overview['total_gainers']} | Losers: {overview['total_losers']}\n")
+        add(f"## Market Overview\n")
+        add(f"- Health: **{overview['market_health'].upper()}**")
+        add(f"- Gainers: {overview['total_gainers']} | Losers: {overview['total_losers']}\n")
         
-        md.append("## Top Gainers\n")
+        add("## Top Gainers\n")
         for g in brief['top_gainers'][:5]:
-            md.append(f"{g['rank']}. **{g['symbol']}** - ${g['price']} (+{g['change_percent']}%)")
+            add(f"{g['rank']}. **{g['symbol']}** - ${g['price']} (+{g['change_percent']}%)")
         
-        md.append("\n## Top Losers\n")
+        add("\n## Top Losers\n")
         for l in brief['top_losers'][:5]:
-            md.append(f"{l['rank']}. **{l['symbol']}** - ${l['price']} ({l['change_percent']}%)")
+            add(f"{l['rank']}. **{l['symbol']}** - ${l['price']} ({l['change_percent']}%)")
         
-        md.append("\n## Key Insights\n")
+        add("\n## Key Insights\n")
         for insight in brief['key_insights']:
-            md.append(f"- {insight}")
+            add(f"- {insight}")
         
-        return "\n".join(md)
+        del md[-1:]  # no newline after the last line
+        return md
     
-    def _evaluate_previous_predictions(self, current_date_str: str) -> Dict[str, Any]:
+    def _evaluate_previous_predictions(self, current_date_str: str, gainers: List[Dict], losers: List[Dict]) -> Dict[str, Any]:
         """Evaluate previous day's predictions against actual movements"""
         from datetime import datetime, timedelta
         
@@ -242,20 +339,26 @@ class MarketBriefAgent:
             previous_date = current_date - timedelta(days=days_back)
             previous_date_str = previous_date.strftime('%Y-%m-%d')
             
-            # Load previous day's brief
-            previous_brief_path = self.output_dir / f"market_brief_{previous_date_str}.json"
-            if not previous_brief_path.exists():
+            # Load previous day's brief, preferring its compact evaluation
+            # summary, then the gzip archive, then a plain (older) brief
+            candidates = [
+                self.output_dir / f"market_brief_{previous_date_str}.summary.json",
+                self.output_dir / f"market_brief_{previous_date_str}.json.gz",
+                self.output_dir / f"market_brief_{previous_date_str}.json",
+            ]
+            previous_brief_path = next((p for p in candidates if p.exists()), None)
+            if previous_brief_path is None:
                 logger.info(f"No previous brief found for {previous_date_str}, skipping evaluation")
                 return None
             
-            with open(previous_brief_path, 'r') as f:
-                previous_brief = json.load(f)
+            with open(previous_brief_path, 'rb') as f:
+                raw = f.read()
+            if previous_brief_path.suffix == '.gz':
+                raw = gzip.decompress(raw)
+            previous_brief = orjson.loads(raw)
             
-            # Get current actual movements
-            gainers, losers = self.data_fetcher.get_stock_data()
-            actual_movements = {}
-            for mover in gainers + losers:
-                actual_movements[mover['symbol']] = mover['change']
+            # Actual movements come from today's already-fetched movers
+            actual_movements = {mover['symbol']: mover['change'] for mover in chain(gainers, losers)}
             
             # Build analysis results from previous brief
             analysis_results = {
@@ -265,9 +368,12 @@ class MarketBriefAgent:
                 'unknown': []
             }
             
+            # Lowercase the previous headlines once for all movers
+            news_text = self._news_text(previous_brief.get('news_analysis', {}))
+            
             # Categorize previous predictions
             for gainer in previous_brief.get('top_gainers', []):
-                category = self._categorize_movement(gainer, previous_brief.get('news_analysis', {}))
+                category = self._categorize_movement(gainer, news_text)
                 analysis_results[category].append({
                     'ticker': gainer['symbol'],
                     'move_type': 'gainer',
@@ -276,7 +382,7 @@ class MarketBriefAgent:
                 })
             
             for loser in previous_brief.get('top_losers', []):
-                category = self._categorize_movement(loser, previous_brief.get('news_analysis', {}))
+                category = self._categorize_movement(loser, news_text)
                 analysis_results[category].append({
                     'ticker': loser['symbol'],
                     'move_type': 'loser',
@@ -315,17 +421,22 @@ class MarketBriefAgent:
             logger.warning(f"Error during evaluation: {str(e)}")
             return None
     
-    def _categorize_movement(self, mover: Dict, news_analysis: Dict) -> str:
+    @staticmethod
+    def _news_text(news_analysis: Dict) -> str:
+        """Join lowercased article titles into one newline-separated string"""
+        return '\n'.join(
+            article.get('title', '').lower()
+            for article in news_analysis.get('articles', [])
+        )
+    
+    def _categorize_movement(self, mover: Dict, news_text: str) -> str:
         """Categorize a stock movement based on available information"""
         # Simple categorization logic
         # In a real system, this would be more sophisticated
-        articles = news_analysis.get('articles', [])
         
-        # Check if there's news about this ticker
-        has_news = any(
-            mover['symbol'].lower() in article.get('title', '').lower()
-            for article in articles
-        )
+        # Check if there's news about this ticker. Symbols never contain a
+        # newline, so one substring search matches any single title.
+        has_news = bool(news_text) and mover['symbol'].lower() in news_text
         
         if has_news:
             return 'news'
@@ -346,35 +457,28 @@ def main():
         print(f"❌ Error: {brief['error']}")
         return
     
-    # Print summary
-    print("\n" + "=" * 70)
-    print("📋 BRIEF SUMMARY")
-    print("=" * 70)
-    
+    # Print summary (built as one block, written with a single print)
     overview = brief['market_overview']
-    print(f"\n🎯 Market Health: {overview['market_health'].upper()}")
-    print(f"📈 Gainers: {overview['total_gainers']}")
-    print(f"📉 Losers: {overview['total_losers']}")
-    
-    print("\n🚀 Top 3 Gainers:")
-    for g in brief['top_gainers'][:3]:
-        print(f"   {g['rank']}. {g['symbol']} - ${g['price']} (+{g['change_percent']}%)")
-    
-    print("\n📉 Top 3 Losers:")
-    for l in brief['top_losers'][:3]:
-        print(f"   {l['rank']}. {l['symbol']} - ${l['price']} ({l['change_percent']}%)")
-    
-    print("\n💡 Key Insights:")
-    for insight in brief['key_insights']:
-        print(f"   • {insight}")
-    
-    print("\n🎯 Recommendations:")
-    for rec in brief['recommendations']:
-        print(f"   • {rec}")
-    
-    print("\n" + "=" * 70)
-    print("✅ Brief generation complete! Check ./output/ for files.")
-    print("=" * 70 + "\n")
+    lines = [
+        "\n" + "=" * 70,
+        "📋 BRIEF SUMMARY",
+        "=" * 70,
+        f"\n🎯 Market Health: {overview['market_health'].upper()}",
+        f"📈 Gainers: {overview['total_gainers']}",
+        f"📉 Losers: {overview['total_losers']}",
+        "\n🚀 Top 3 Gainers:",
+        *(f"   {g['rank']}. {g['symbol']} - ${g['price']} (+{g['change_percent']}%)" for g in brief['top_gainers'][:3]),
+        "\n📉 Top 3 Losers:",
+        *(f"   {l['rank']}. {l['symbol']} - ${l['price']} ({l['change_percent']}%)" for l in brief['top_losers'][:3]),
+        "\n💡 Key Insights:",
+        *(f"   • {insight}" for insight in brief['key_insights']),
+        "\n🎯 Recommendations:",
+        *(f"   • {rec}" for rec in brief['recommendations']),
+        "\n" + "=" * 70,
+        "✅ Brief generation complete! Check ./output/ for files.",
+        "=" * 70 + "\n",
+    ]
+    print("\n".join(lines))
 
 
 if __name__ == "__main__":
@@ -2,6 +2,10 @@
 Main Entry Point for Market Movers Dashboard
 Run this file to start the dashboard application
 """
+# Patch the standard library for cooperative sockets before Flask is imported
+import eventlet
+eventlet.monkey_patch()
+
 import sys
 from pathlib import Path
 
@@ -10,7 +14,7 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 # Import and run the dashboard
-from data_visualization.simple_dashboard import app, socketio
+from data_visualization.simple_dashboard import app, socketio, initialize_dashboard
 
 if __name__ == '__main__':
     print("=" * 60)
@@ -22,10 +26,14 @@ if __name__ == '__main__':
     print("\nPress Ctrl+C to stop the server\n")
     print("=" * 60)
     
-    # Run the dashboard
+    # Start the background market data refresh, then run the dashboard on
+    # the eventlet server. Debug mode stays off: it wraps every request in
+    # the debugger middleware. For deployment, use a single eventlet worker
+    # (Socket.IO sessions live in process memory without a message queue):
+    #   gunicorn -k eventlet -w 1 -b 0.0.0.0:5001 main:app
+    initialize_dashboard()
     socketio.run(app, 
                 host='0.0.0.0', 
                 port=5001, 
-                debug=True, 
-                use_reloader=False,
-                allow_unsafe_werkzeug=True)
+                debug=False, 
+                use_reloader=False)
@@ -0,0 +1,6 @@
+"""
+Text helpers shared by the testing scripts (standard library only)
+"""
+
+# str.translate table that strips control characters (e.g. embedded newlines) from headlines
+CONTROL_CHARS_TABLE = str.maketrans('', '', bytes(range(32)).decode('latin1'))
@@ -8,7 +8,7 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
-from data_process.sentiment_analyzer import DistilBERTSentimentAnalyzer
+from data_process.sentiment_analyzer import get_sentiment_analyzer
 
 def test_sentiment_analyzer():
     print("Testing Sentiment Analyzer...")
@@ -16,7 +16,7 @@ def test_sentiment_analyzer():
     
     # Initialize analyzer
     print("\n1. Initializing DistilBERT Sentiment Analyzer...")
-    analyzer = DistilBERTSentimentAnalyzer()
+    analyzer = get_sentiment_analyzer()
     print("✓ Analyzer initialized successfully")
     
     # Test with sample news headlines
@@ -34,11 +34,8 @@ def test_sentiment_analyzer():
     
     print("\n3. Results:")
     print("-" * 60)
-    for text, (idx, row) in zip(test_texts, results.iterrows()):
-        sentiment = row['sentiment']
-        pos_score = row['positive_score']
-        neg_score = row['negative_score']
-        
+    for text, sentiment, pos_score, neg_score in zip(
+            test_texts, results['sentiment'], results['positive_score'], results['negative_score']):
         print(f"\nText: {text}")
         print(f"  Sentiment: {sentiment}")
         print(f"  Positive Score: {pos_score:.3f}")
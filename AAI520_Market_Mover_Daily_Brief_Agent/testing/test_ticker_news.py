@@ -3,6 +3,7 @@
 Test script to verify ticker-specific news with sentiment analysis
 """
 import sys
+from collections import Counter
 from pathlib import Path
 
 # Add project root to path
@@ -10,6 +11,7 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from data_fetch.data_fetcher import DataFetcher
+from _text import CONTROL_CHARS_TABLE
 import json
 
 def test_ticker_news():
@@ -43,7 +45,7 @@ def test_ticker_news():
                 if len(news) > 0:
                     article = news[0]
                     print(f"   📰 Sample Article:")
-                    print(f"      Title: {article.get('title', 'N/A')[:80]}...")
+                    print(f"      Title: {article.get('title', 'N/A').translate(CONTROL_CHARS_TABLE)[:80]}...")
                     print(f"      Source: {article.get('source', 'N/A')}")
                     print(f"      Published: {article.get('published_at', 'N/A')}")
                     print()
@@ -75,10 +77,11 @@ def test_ticker_news():
             print(f"   ✅ Found {len(news)} articles for {', '.join(multi_tickers)}")
             print()
             
-            # Show sentiment distribution
-            positive_count = sum(1 for a in news if a.get('sentiment') == 'positive')
-            negative_count = sum(1 for a in news if a.get('sentiment') == 'negative')
-            neutral_count = sum(1 for a in news if a.get('sentiment') == 'neutral')
+            # Show sentiment distribution (one pass over the articles)
+            counts = Counter(a.get('sentiment') for a in news)
+            positive_count = counts['positive']
+            negative_count = counts['negative']
+            neutral_count = counts['neutral']
             
             print(f"   📊 Sentiment Distribution:")
             print(f"      ✅ Positive: {positive_count}")
@@ -92,7 +95,7 @@ def test_ticker_news():
                 sentiment = article.get('sentiment', 'unknown')
                 score = article.get('sentiment_score', 0)
                 emoji = "✅" if sentiment == "positive" else "❌" if sentiment == "negative" else "➖"
-                print(f"      {i}. {emoji} {article.get('title', 'N/A')[:60]}...")
+                print(f"      {i}. {emoji} {article.get('title', 'N/A').translate(CONTROL_CHARS_TABLE)[:60]}...")
                 print(f"         Sentiment: {sentiment.upper()} ({score:.3f})")
                 print()
         else:
@@ -4,8 +4,12 @@ Verification script to test the Market Movers Dashboard
 """
 import requests
 import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from _text import CONTROL_CHARS_TABLE
+
 def test_dashboard():
     """Test all dashboard endpoints and features"""
     base_url = "http://localhost:5001"
@@ -15,10 +19,17 @@ def test_dashboard():
     print("=" * 70)
     print()
     
+    # Issue both requests up front over one keep-alive session; the checks
+    # below then consume the responses in order
+    session = requests.Session()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        homepage_request = executor.submit(session.get, base_url, timeout=5)
+        market_data_request = executor.submit(session.get, f"{base_url}/api/market-data", timeout=10)
+    
     # Test 1: Homepage
     print("1. Testing Homepage...")
     try:
-        response = requests.get(base_url, timeout=5)
+        response = homepage_request.result()
         if response.status_code == 200:
             print("   ✅ Homepage is accessible")
         else:
@@ -30,7 +41,7 @@ def test_dashboard():
     # Test 2: Market Data API
     print("\n2. Testing Market Data API...")
     try:
-        response = requests.get(f"{base_url}/api/market-data", timeout=10)
+        response = market_data_request.result()
         if response.status_code == 200:
             data = response.json()
             print(f"   ✅ API is working")
@@ -46,9 +57,11 @@ def test_dashboard():
                 print(f"   Found {len(news)} news articles with sentiment analysis:")
                 print()
                 
-                positive_count = sum(1 for article in news if article.get('sentiment') == 'positive')
-                negative_count = sum(1 for article in news if article.get('sentiment') == 'negative')
-                neutral_count = sum(1 for article in news if article.get('sentiment') == 'neutral')
+                # Tally every label in one pass over the articles
+                counts = Counter(article.get('sentiment') for article in news)
+                positive_count = counts['positive']
+                negative_count = counts['negative']
+                neutral_count = counts['neutral']
                 
                 print(f"   📈 Positive: {positive_count}")
                 print(f"   📉 Negative: {negative_count}")
@@ -62,7 +75,7 @@ def test_dashboard():
                     score = article.get('sentiment_score', 0)
                     pos_score = article.get('positive_score', 0)
                     neg_score = article.get('negative_score', 0)
-                    title = article.get('title', 'No title')[:60]
+                    title = article.get('title', 'No title').translate(CONTROL_CHARS_TABLE)[:60]
                     
                     emoji = "✅" if sentiment == "positive" else "❌" if sentiment == "negative" else "➖"
                     print(f"\n   {emoji} Article {i}:")